@@ -0,0 +1,128 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# How long each channel may take before the dispatcher stops waiting for it
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("ALERT_DEADLINE_SECONDS", "30"))
+LATENCY_HISTORY = 100  # Latency samples kept per channel
+
+
+class AlertNotConfigured(Exception):
+    """
+    Raised by a channel's send function when its credentials or recipients
+    are missing. Retrying cannot help, so the alert fails permanently.
+    """
+
+
+class AlertDispatcher:
+    """
+    Fires every alert channel at once on a thread pool.
+
+    `channels` maps a name to (send, deadline_seconds), where send(*args)
+    delivers the alert and returns a true value on success. dispatch() waits for each channel until its own
+    deadline and records dispatch-to-acknowledge latency per channel, so a
+    slow SMTP handshake no longer delays the phone call. A channel that
+    misses its deadline keeps running in the background but is reported as
+    timed out.
+    """
+
+    def __init__(self, channels):
+        self.channels = dict(channels)
+        # Spare workers so a hung channel cannot hold up the next dispatch
+        self._executor = ThreadPoolExecutor(max_workers=2 * max(1, len(self.channels)),
+                                            thread_name_prefix="alert")
+        self._latencies = {name: deque(maxlen=LATENCY_HISTORY) for name in self.channels}
+        self._counts = {name: {'sent': 0, 'failed': 0, 'timed_out': 0} for name in self.channels}
+        self._first_contact = deque(maxlen=LATENCY_HISTORY)
+        self._lock = threading.Lock()
+
+    def _run(self, send, args, started):
+        result = send(*args)
+        return result, time.perf_counter() - started
+
+    def dispatch(self, *args, channels=None):
+        """
+        Send on all channels (or only the named `channels`) concurrently and
+        wait until each has finished or passed its deadline. Returns
+        {name: report}, where report has 'status' ('sent', 'failed' or
+        'timed_out'), 'latency' and 'result' or 'error'.
+        """
+        started = time.perf_counter()
+        futures = {}
+        for name in channels or self.channels:
+            send, deadline = self.channels[name]
+            future = self._executor.submit(self._run, send, args, started)
+            futures[future] = (name, started + deadline)
+
+        reports = {}
+        pending = set(futures)
+        while pending:
+            next_deadline = min(futures[f][1] for f in pending)
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - time.perf_counter()),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future][0]
+                try:
+                    result, latency = future.result()
+                    status = 'sent' if result else 'failed'
+                    reports[name] = {'status': status, 'latency': latency, 'result': result}
+                except Exception as e:
+                    reports[name] = {'status': 'failed', 'latency': time.perf_counter() - started, 'error': e}
+            now = time.perf_counter()
+            for future in [f for f in pending if futures[f][1] <= now]:
+                pending.discard(future)
+                reports[futures[future][0]] = {'status': 'timed_out', 'latency': now - started}
+
+        self._record(reports, first_contact=len(futures) > 1)
+        return reports
+
+    def send(self, name, *args):
+        """
+        Send on one channel, waiting at most its deadline. Returns its report.
+        """
+        return self.dispatch(*args, channels=[name])[name]
+
+    def record_first_contact(self, latency):
+        with self._lock:
+            self._first_contact.append(latency)
+        print(f"📊 Time to first contact: {latency:.2f}s")
+
+    def _record(self, reports, first_contact=True):
+        with self._lock:
+            for name, report in reports.items():
+                self._counts[name][report['status']] += 1
+                if report['status'] == 'sent':
+                    self._latencies[name].append(report['latency'])
+            sent = [r['latency'] for r in reports.values() if r['status'] == 'sent']
+            if sent and first_contact:
+                self._first_contact.append(min(sent))
+
+        for name, report in reports.items():
+            icon = "✅" if report['status'] == 'sent' else "❌"
+            detail = f": {report['error']}" if 'error' in report else ""
+            print(f"{icon} {name}: {report['status']} after {report['latency']:.2f}s{detail}")
+        if sent and first_contact:
+            print(f"📊 Time to first contact: {min(sent):.2f}s")
+
+    def stats(self):
+        """
+        Per-channel counters with median and worst latency of recent sends,
+        plus the median time to first contact.
+        """
+        def summary(samples):
+            if not samples:
+                return {'median': None, 'max': None}
+            ordered = sorted(samples)
+            return {'median': ordered[len(ordered) // 2], 'max': ordered[-1]}
+
+        with self._lock:
+            stats = {name: dict(self._counts[name], latency=summary(self._latencies[name]))
+                     for name in self.channels}
+            stats['first_contact'] = summary(self._first_contact)
+        return stats
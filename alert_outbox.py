@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import uuid
+import random
+import threading
+from alert_dispatcher import AlertNotConfigured
+from database_utils import (
+    enqueue_alert, claim_due_alert, next_alert_due, finish_alert, requeue_interrupted_alerts
+)
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Retry policy for alerts that could not be delivered
+RETRY_BASE_SECONDS = float(os.getenv("ALERT_RETRY_BASE_SECONDS", "5"))
+RETRY_MAX_SECONDS = float(os.getenv("ALERT_RETRY_MAX_SECONDS", "600"))
+MAX_ATTEMPTS = int(os.getenv("ALERT_MAX_ATTEMPTS", "12"))
+# Alerts not delivered within this long are dropped: the incident is over and the location stale
+MAX_AGE_SECONDS = float(os.getenv("ALERT_MAX_AGE_SECONDS", "1800"))
+IDLE_POLL_SECONDS = 30  # Workers re-check the outbox at least this often
+DEFAULT_CHANNEL_CONCURRENCY = 1
+
+
+def backoff_delay(attempts):
+    """
+    Exponential backoff with jitter: between half and all of
+    RETRY_BASE_SECONDS * 2^(n-1), capped at RETRY_MAX_SECONDS.
+    """
+    ceiling = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class AlertOutbox:
+    """
+    Durable delivery of alerts through the alert_outbox table in evidence.db.
+
+    submit() writes one row per channel before anything is sent, keyed by
+    "<incident>:<channel>" so the same incident is never queued twice. Each
+    channel has its own worker threads (their number is the channel's
+    concurrency limit) that claim due rows, send them through the
+    AlertDispatcher and either mark them sent or reschedule them with
+    exponential backoff. Rows left in flight by a crash are requeued on
+    start(), so an outage or restart delays alerts instead of losing them,
+    up to MAX_AGE_SECONDS; older rows are expired rather than sent. A
+    channel that is not configured fails at once without retries.
+    Listeners are told the outcome of every delivery attempt.
+    """
+
+    def __init__(self, dispatcher, concurrency=None):
+        self.dispatcher = dispatcher
+        self.concurrency = {name: max(1, (concurrency or {}).get(name, DEFAULT_CHANNEL_CONCURRENCY))
+                            for name in dispatcher.channels}
+        self._wakeup = {name: threading.Condition() for name in dispatcher.channels}
+        self._signals = {name: 0 for name in dispatcher.channels}
+        self._incidents = {}  # incident key -> submit time, until its first successful send
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        Call `listener(channel, key, status, error)` after each delivery
+        attempt; status is 'sent', 'retrying' or 'failed'. Runs on the
+        channel's worker thread.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, name, key, status, error=None):
+        for listener in list(self._listeners):
+            try:
+                listener(name, key, status, error)
+            except Exception as e:
+                print(f"❌ Outbox listener error: {e}")
+
+    def start(self):
+        requeued = requeue_interrupted_alerts()
+        if requeued:
+            print(f"⚠️ Requeued {requeued} alert(s) interrupted by the last shutdown.")
+        for name, workers in self.concurrency.items():
+            for i in range(workers):
+                thread = threading.Thread(target=self._worker, args=(name,), name=f"outbox-{name}-{i}")
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for condition in self._wakeup.values():
+            with condition:
+                condition.notify_all()
+
+    def submit(self, *args, incident=None):
+        """
+        Queue an alert with the given arguments on every channel and wake the
+        workers. Returns the incident key.
+        """
+        incident = incident or uuid.uuid4().hex
+        payload = json.dumps({'args': list(args)})
+        with self._lock:
+            self._incidents.setdefault(incident, time.perf_counter())
+        for name in self.dispatcher.channels:
+            if enqueue_alert(f"{incident}:{name}", name, payload):
+                condition = self._wakeup[name]
+                with condition:
+                    self._signals[name] += 1
+                    condition.notify()
+        return incident
+
+    def _worker(self, name):
+        condition = self._wakeup[name]
+        while not self._stop.is_set():
+            with condition:
+                seen = self._signals[name]
+            claimed = claim_due_alert(name, MAX_AGE_SECONDS)
+            if claimed is None:
+                due = next_alert_due(name)
+                timeout = IDLE_POLL_SECONDS if due is None else min(IDLE_POLL_SECONDS, max(0.0, due - time.time()))
+                with condition:
+                    # Don't sleep through an alert submitted since the claim
+                    if self._signals[name] == seen and not self._stop.is_set():
+                        condition.wait(timeout)
+                continue
+            self._deliver(name, *claimed)
+
+    def _deliver(self, name, alert_id, key, payload, attempts):
+        args = json.loads(payload)['args']
+        report = self.dispatcher.send(name, *args)
+        if report['status'] == 'sent':
+            finish_alert(alert_id, 'sent')
+            incident = key.rsplit(':', 1)[0]
+            with self._lock:
+                submitted = self._incidents.pop(incident, None)
+            if submitted is not None:
+                self.dispatcher.record_first_contact(time.perf_counter() - submitted)
+            self._notify(name, key, 'sent')
+            return
+
+        error = str(report.get('error') or report['status'])
+        if isinstance(report.get('error'), AlertNotConfigured):
+            print(f"❌ {name} alert {key} not sent: {error}")
+            finish_alert(alert_id, 'failed', error)
+            self._notify(name, key, 'failed', error)
+            return
+        if attempts >= MAX_ATTEMPTS:
+            print(f"❌ Giving up on {name} alert {key} after {attempts} attempts: {error}")
+            finish_alert(alert_id, 'failed', error)
+            self._notify(name, key, 'failed', error)
+            return
+        delay = backoff_delay(attempts)
+        print(f"⚠️ {name} alert failed ({error}); retry {attempts + 1} in {delay:.0f}s")
+        finish_alert(alert_id, 'pending', error, time.time() + delay)
+        self._notify(name, key, 'retrying', error)
@@ -1,34 +1,26 @@
-import os
-from twilio.rest import Client
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from twilio_client import get_twilio_client, TWILIO_PHONE, RECIPIENT_PHONE
+from alert_dispatcher import AlertNotConfigured
 
 def make_call():
     """
     Makes a phone call using Twilio to play a demo audio message when the secret phrase is detected.
+    Uses the shared, pre-warmed Twilio client.
+    Raises AlertNotConfigured if the Twilio settings are missing.
     """
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    twilio_phone = os.getenv("TWILIO_PHONE")
-    recipient_phone = os.getenv("RECIPIENT_PHONE_NUMBER")
+    client = get_twilio_client()
 
     # Check if all required environment variables are set
-    if not all([account_sid, auth_token, twilio_phone, recipient_phone]):
-        print("❌ Error: Twilio environment variables not set. Cannot make phone call.")
-        return
+    if client is None:
+        raise AlertNotConfigured("Twilio environment variables not set. Cannot make phone call.")
 
     try:
-        client = Client(account_sid, auth_token)
-        
         # Make the call
         # This will use Twilio's text-to-speech to say a message
         # You can replace the 'url' parameter with a TwiML Bin URL if you want to play custom audio
         call = client.calls.create(
             twiml='<Response><Say>Emergency alert! The secret phrase has been detected. This is an automated call from Silent Sentinel.</Say></Response>',
-            from_=twilio_phone,
-            to=recipient_phone
+            from_=TWILIO_PHONE,
+            to=RECIPIENT_PHONE
         )
         print(f"✅ Phone call initiated successfully! Call SID: {call.sid}")
         return call.sid
@@ -0,0 +1,133 @@
+import threading
+
+# Defaults for the detection windows taken from the capture buffer
+WINDOW_SECONDS = 5.0
+HOP_SECONDS = 2.5
+BUFFER_SECONDS = 30
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size circular buffer of raw PCM bytes.
+
+    The capture thread keeps writing into it while readers pull windows by
+    absolute byte position, so nothing is dropped while a window is being
+    transcribed. Data older than the buffer capacity is overwritten.
+    """
+
+    def __init__(self, rate, channels=1, sample_width=2, seconds=BUFFER_SECONDS):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_size = channels * sample_width
+        self.bytes_per_second = rate * self.frame_size
+        self.capacity = int(seconds * rate) * self.frame_size
+        self._buf = bytearray(self.capacity)
+        self._written = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def bytes_written(self):
+        with self._cond:
+            return self._written
+
+    def write(self, data):
+        """
+        Append a chunk of PCM bytes, overwriting the oldest audio when full.
+        """
+        n = len(data)
+        if n == 0:
+            return
+        with self._cond:
+            if n > self.capacity:
+                # Only the newest audio can fit; account for the skipped part
+                self._written += n - self.capacity
+                data = data[n - self.capacity:]
+                n = self.capacity
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self._buf[start:start + first] = data[:first]
+            if first < n:
+                self._buf[0:n - first] = data[first:]
+            self._written += n
+            self._cond.notify_all()
+
+    def close(self):
+        """
+        Wake up any waiting readers; no more data will be written.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def wait_for(self, position, timeout=None):
+        """
+        Block until at least `position` bytes have been written in total.
+        Returns False if the buffer was closed or the timeout expired first.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._written >= position or self._closed, timeout
+            ) and self._written >= position
+
+    def read(self, start, length):
+        """
+        Return `length` bytes starting at absolute position `start`, or None
+        if that audio has already been overwritten or not yet captured.
+        """
+        with self._cond:
+            end = start + length
+            if end > self._written or start < self._written - self.capacity:
+                return None
+            offset = start % self.capacity
+            first = min(length, self.capacity - offset)
+            data = bytes(self._buf[offset:offset + first])
+            if first < length:
+                data += bytes(self._buf[0:length - first])
+            return data
+
+
+class WindowReader:
+    """
+    Takes overlapping detection windows (e.g. 5 s every 2.5 s) from an
+    AudioRingBuffer, so a phrase spanning a window boundary is still seen
+    whole by the next window.
+    """
+
+    def __init__(self, ring, window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS):
+        self.ring = ring
+        self.window_bytes = self._align(window_seconds)
+        self.hop_bytes = self._align(hop_seconds)
+        self.position = ring.bytes_written
+
+    def _align(self, seconds):
+        return int(seconds * self.ring.rate) * self.ring.frame_size
+
+    def next_window(self, stop_event=None):
+        """
+        Wait for the next window and return (start_seconds, pcm_bytes), where
+        start_seconds is measured from the start of the capture. Returns None
+        once stop_event is set or the buffer is closed.
+        """
+        while stop_event is None or not stop_event.is_set():
+            end = self.position + self.window_bytes
+            if not self.ring.wait_for(end, timeout=0.5):
+                if self.ring.closed:
+                    return None
+                continue
+            pcm = self.ring.read(self.position, self.window_bytes)
+            if pcm is None:
+                # The detector fell behind by more than the buffer holds
+                print("⚠️ Detection fell behind capture; skipping to live audio.")
+                written = self.ring.bytes_written
+                self.position = max(0, written - self.window_bytes)
+                continue
+            start_seconds = self.position / self.ring.bytes_per_second
+            self.position += self.hop_bytes
+            return start_seconds, pcm
+        return None
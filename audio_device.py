@@ -0,0 +1,121 @@
+import threading
+import time
+import pyaudio
+
+# Capture settings shared by every consumer of the microphone
+FORMAT = pyaudio.paInt16
+CHANNELS = 1
+RATE = 44100
+CHUNK = 1024
+SAMPLE_WIDTH = pyaudio.get_sample_size(FORMAT)
+
+
+class AudioDeviceManager:
+    """
+    Owns the single PyAudio instance and the single microphone input stream.
+
+    Consumers (detector, evidence recorder, level meter, ...) subscribe a
+    callback instead of opening their own stream. One capture thread reads
+    each chunk once and hands the same immutable bytes object to every
+    subscriber, so fan-out costs no copies. The stream is opened on the
+    first subscription and closed when the last subscriber leaves.
+
+    Callbacks run on the capture thread and must return quickly.
+    """
+
+    def __init__(self, rate=RATE, channels=CHANNELS, chunk=CHUNK, fmt=FORMAT):
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.format = fmt
+        self.sample_width = pyaudio.get_sample_size(fmt)
+        self._audio = None
+        self._stream = None
+        self._thread = None
+        self._running = threading.Event()
+        self._subscribers = ()
+        self._next_token = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Register callback(chunk_bytes) and start capturing if needed.
+        Returns a token for unsubscribe(). Raises OSError if the microphone
+        cannot be opened.
+        """
+        with self._lock:
+            if self._stream is None:
+                self._open()
+            token = self._next_token
+            self._next_token += 1
+            # Copy-on-write so the capture thread can iterate without locking
+            self._subscribers = self._subscribers + ((token, callback),)
+            return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s[0] != token)
+            if not self._subscribers and self._stream is not None:
+                self._close()
+
+    def _open(self):
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=self.format, channels=self.channels, rate=self.rate,
+                                        input=True, frames_per_buffer=self.chunk)
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture, args=(self._stream,), name="audio-capture")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _close(self):
+        self._running.clear()
+        thread, self._thread = self._thread, None
+        self._stream = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1)
+
+    def _capture(self, stream):
+        while self._running.is_set():
+            try:
+                data = stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                print(f"⚠️ Audio read error: {e}")
+                time.sleep(0.05)
+                continue
+            for _, callback in self._subscribers:
+                try:
+                    callback(data)
+                except Exception as e:
+                    print(f"❌ Audio subscriber error: {e}")
+        try:
+            stream.stop_stream()
+            stream.close()
+        except Exception as e:
+            print(f"⚠️ Error closing audio stream: {e}")
+
+    def shutdown(self):
+        """
+        Drop all subscribers, close the stream and release PyAudio.
+        """
+        with self._lock:
+            self._subscribers = ()
+            if self._stream is not None:
+                self._close()
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+
+
+_device = None
+_device_lock = threading.Lock()
+
+def get_audio_device():
+    """
+    Return the process-wide AudioDeviceManager.
+    """
+    global _device
+    with _device_lock:
+        if _device is None:
+            _device = AudioDeviceManager()
+        return _device
@@ -1,72 +1,263 @@
-import pyaudio
-import wave
 import os
+import struct
 import datetime
 import threading
+from dotenv import load_dotenv
 from database_utils import insert_audio_log
+from evidence_codec import submit_encoding
+from audio_device import get_audio_device, CHANNELS, RATE
+from audio_buffer import AudioRingBuffer
+
+# Load environment variables from .env file
+load_dotenv()
 
 # Constants for audio recording
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RATE = 44100
-CHUNK = 1024
 EVIDENCE_SECONDS = 600  # 10 minutes
 EVIDENCE_DIR = "evidence"
+HEADER_UPDATE_SECONDS = 5  # How often the WAV header is patched and synced to disk
+# Audio from before the trigger that is included at the start of each evidence file
+PRE_TRIGGER_SECONDS = float(os.getenv("PRE_TRIGGER_SECONDS", "30"))
+READ_SLACK_SECONDS = 10  # Extra ring capacity so the writer can lag behind capture
+
+
+class StreamingWavWriter:
+    """
+    Writes a PCM WAV file incrementally.
+
+    Audio is appended as it arrives and the RIFF/data lengths in the header
+    are rewritten (and the file fsync'ed) every HEADER_UPDATE_SECONDS, so a
+    crash or power loss leaves a playable file with everything up to the
+    last update.
+    """
+
+    def __init__(self, filename, channels, sample_width, rate, update_seconds=HEADER_UPDATE_SECONDS):
+        self.filename = filename
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.update_bytes = int(update_seconds * rate) * channels * sample_width
+        self.data_bytes = 0
+        self._unsynced = 0
+        self._file = open(filename, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        block_align = self.channels * self.sample_width
+        self._file.seek(0)
+        self._file.write(struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + self.data_bytes, b'WAVE',
+            b'fmt ', 16, 1, self.channels, self.rate, self.rate * block_align, block_align,
+            self.sample_width * 8,
+            b'data', self.data_bytes))
+        self._file.seek(0, os.SEEK_END)
+
+    def write(self, data):
+        self._file.write(data)
+        self.data_bytes += len(data)
+        self._unsynced += len(data)
+        if self._unsynced >= self.update_bytes:
+            self.sync()
 
-def _record_and_save():
+    def sync(self):
+        """
+        Patch the header to the current length and force everything to disk.
+        """
+        self._write_header()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    @property
+    def duration(self):
+        return self.data_bytes / (self.rate * self.channels * self.sample_width)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+
+class PreTriggerBuffer:
     """
-    Internal function to handle the actual recording and file saving.
-    This runs in a separate thread.
+    Rolling buffer of the last PRE_TRIGGER_SECONDS of microphone audio at the
+    full capture rate, so evidence can start before the trigger.
+
+    The buffer is a preallocated AudioRingBuffer: each chunk is copied once
+    into it and nothing is copied when a recording starts, the recorder just
+    reads on from an earlier position. It is fed for as long as anyone holds
+    it, i.e. while monitoring and until every recording has finished.
     """
-    audio = pyaudio.PyAudio()
-
-    try:
-        # Open microphone stream
-        stream = audio.open(format=FORMAT, channels=CHANNELS,
-                            rate=RATE, input=True,
-                            frames_per_buffer=CHUNK)
-        
-        frames = []
-        
-        # Record for the specified duration
-        for _ in range(0, int(RATE / CHUNK * EVIDENCE_SECONDS)):
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            frames.append(data)
-
-        # Stop and close the stream
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
+
+    def __init__(self, seconds=PRE_TRIGGER_SECONDS):
+        self.seconds = max(0.0, seconds)
+        self.device = get_audio_device()
+        self.ring = None
+        self._users = 0
+        self._subscription = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Start buffering if needed and return the live AudioRingBuffer.
+        Raises OSError if the microphone cannot be opened.
+        """
+        with self._lock:
+            if self._users == 0:
+                ring = AudioRingBuffer(RATE, CHANNELS, self.device.sample_width,
+                                       seconds=self.seconds + READ_SLACK_SECONDS)
+                self._subscription = self.device.subscribe(ring.write)
+                self.ring = ring
+            self._users += 1
+            return self.ring
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                self.device.unsubscribe(self._subscription)
+                self._subscription = None
+                self.ring.close()
+
+
+class EvidenceRecorder:
+    """
+    Records evidence from the shared microphone stream straight to disk.
+
+    The recording starts with the audio held in the pre-trigger buffer and
+    then follows the live edge of the same buffer; a writer thread streams
+    it into a StreamingWavWriter, so memory use stays constant however long
+    the recording is. extend() keeps a running recording going longer.
+    The location and the phrases heard are stored with the database entry.
+    """
+
+    def __init__(self, seconds=EVIDENCE_SECONDS, pre_trigger=None, location_url=None, transcription=None):
+        self.device = get_audio_device()
+        self.pre_trigger = pre_trigger or get_pretrigger_buffer()
+        frame_size = CHANNELS * self.device.sample_width
+        self.pre_trigger_bytes = int(RATE * self.pre_trigger.seconds) * frame_size
+        self.target_bytes = int(RATE * seconds) * frame_size
+        self.filename = None
+        self.location_url = location_url
+        self.transcriptions = [transcription] if transcription else []
+        self._ring = None
+        self._position = 0
+        self._end = 0
+        self._finished = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        # Pin the start position now, at trigger time, before anything else runs
+        try:
+            self._ring = self.pre_trigger.acquire()
+        except OSError as e:
+            print(f"❌ Failed to record evidence audio: {e}")
+            self._finished = True
+            return
+        written = self._ring.bytes_written
+        self._position = written - min(written, self.pre_trigger_bytes)
+        # Pre-trigger audio plus the specified duration after the trigger
+        self._end = written + self.target_bytes
 
         # Create the evidence directory if it doesn't exist
         os.makedirs(EVIDENCE_DIR, exist_ok=True)
-        
+
         # Generate a timestamped filename
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(EVIDENCE_DIR, f"evidence_{timestamp}.wav")
-
-        # Save the recorded data as a WAV file
-        with wave.open(filename, 'wb') as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(pyaudio.PyAudio().get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-        
-        print(f"🎙️ Evidence audio recorded: {filename}")
-        # Log the evidence audio in the database
-        insert_audio_log(filename)
-
-    except Exception as e:
-        print(f"❌ Failed to record evidence audio: {e}")
-
-def record_evidence_audio():
+        self.filename = os.path.join(EVIDENCE_DIR, f"evidence_{timestamp}.wav")
+
+        self._thread = threading.Thread(target=self._record_and_save)
+        self._thread.daemon = True  # Allows main program to exit even if thread is running
+        self._thread.start()
+
+    def _record_and_save(self):
+        """
+        Internal function to handle the actual recording and file saving.
+        This runs in a separate thread.
+        """
+        ring = self._ring
+        writer = None
+        try:
+            writer = StreamingWavWriter(self.filename, CHANNELS, self.device.sample_width, RATE)
+            position = self._position
+            while True:
+                with self._lock:
+                    if position >= self._end:
+                        self._finished = True
+                        break
+                    end = self._end
+                if not ring.wait_for(position + 1, timeout=1):
+                    if ring.closed:
+                        break
+                    continue
+                # The first read flushes the whole pre-trigger audio in one write
+                length = min(ring.bytes_written, end) - position
+                data = ring.read(position, length)
+                if data is None:
+                    print("⚠️ Evidence writer fell behind capture; some audio was lost.")
+                    position = ring.bytes_written
+                    continue
+                writer.write(data)
+                position += length
+        except Exception as e:
+            print(f"❌ Failed to record evidence audio: {e}")
+        finally:
+            with self._lock:
+                self._finished = True
+            self.pre_trigger.release()
+            if writer is not None:
+                writer.close()
+
+        if writer is not None and writer.data_bytes:
+            print(f"🎙️ Evidence audio recorded: {self.filename}")
+            # Compress in the background, then log the stored file in the database
+            submit_encoding(self.filename, self._log)
+
+    def extend(self, seconds=EVIDENCE_SECONDS, transcription=None):
+        """
+        Keep recording until at least `seconds` from now, adding the phrase
+        that was heard to the transcription. Returns False if the recording
+        has already finished (or never started).
+        """
+        with self._lock:
+            if self._finished or self._ring is None:
+                return False
+            if transcription and transcription not in self.transcriptions:
+                self.transcriptions.append(transcription)
+            frame_size = CHANNELS * self.device.sample_width
+            self._end = max(self._end, self._ring.bytes_written + int(RATE * seconds) * frame_size)
+            return True
+
+    def _log(self, filename, codec, duration_seconds, size_bytes):
+        self.filename = filename
+        with self._lock:
+            transcription = " / ".join(self.transcriptions) or None
+        insert_audio_log(filename, location_url=self.location_url, transcription=transcription,
+                         codec=codec, duration_seconds=duration_seconds, size_bytes=size_bytes)
+
+_pretrigger_buffer = None
+_pretrigger_lock = threading.Lock()
+
+def get_pretrigger_buffer():
+    """
+    Return the process-wide PreTriggerBuffer.
+    """
+    global _pretrigger_buffer
+    with _pretrigger_lock:
+        if _pretrigger_buffer is None:
+            _pretrigger_buffer = PreTriggerBuffer()
+        return _pretrigger_buffer
+
+def record_evidence_audio(location_url=None, transcription=None):
     """
     Starts the audio evidence recording in a non-blocking thread.
     """
     print("🎙️ Starting evidence recording...")
-    thread = threading.Thread(target=_record_and_save)
-    thread.daemon = True  # Allows main program to exit even if thread is running
-    thread.start()
+    recorder = EvidenceRecorder(location_url=location_url, transcription=transcription)
+    recorder.start()
+    return recorder
 
 if __name__ == '__main__':
     # This block allows you to test the evidence recording directly
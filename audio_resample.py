@@ -0,0 +1,77 @@
+from functools import lru_cache
+from math import gcd
+import numpy as np
+
+# Speech recognizers work natively at 16 kHz mono
+RECOGNIZER_RATE = 16000
+TAPS_PER_PHASE = 24  # Filter length per polyphase branch (at the input rate)
+
+
+@lru_cache(maxsize=8)
+def _polyphase_bank(up, down, taps_per_phase=TAPS_PER_PHASE):
+    """
+    Design a Kaiser-windowed sinc low-pass filter for rational resampling by
+    up/down and split it into `up` polyphase branches of taps_per_phase each.
+    """
+    n_taps = up * taps_per_phase
+    cutoff = 0.5 / max(up, down) * 0.9  # cycles per upsampled sample, with guard band
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(n_taps, 8.0) * up
+    # bank[p, k] = h[p + k*up]: the taps applied to x[i - k] for output phase p
+    return h.reshape(taps_per_phase, up).T.copy()
+
+
+class StreamingResampler:
+    """
+    Polyphase resampler for int16 mono PCM that can be fed chunk by chunk.
+
+    Filter history and the output phase are carried across calls, so the
+    capture thread can convert each chunk as it arrives and get the same
+    result as resampling the whole recording at once.
+    """
+
+    def __init__(self, src_rate, dst_rate=RECOGNIZER_RATE, taps_per_phase=TAPS_PER_PHASE):
+        g = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        self.taps = taps_per_phase
+        self.bank = _polyphase_bank(self.up, self.down, taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1)
+        self._consumed = 0  # input samples seen so far
+        self._next_out = 0  # index of the next output sample
+
+    def process(self, pcm):
+        """
+        Resample a chunk of int16 PCM bytes and return int16 PCM bytes.
+        """
+        if self.up == self.down:
+            return bytes(pcm)
+        x = np.frombuffer(pcm, dtype=np.int16).astype(np.float64)
+        if len(x) == 0:
+            return b''
+        buf = np.concatenate((self._history, x))
+        buf_start = self._consumed - len(self._history)  # input index of buf[0]
+        self._consumed += len(x)
+
+        # Every output whose newest input sample is already available
+        last_out = (self._consumed * self.up - 1) // self.down
+        outs = np.arange(self._next_out, last_out + 1, dtype=np.int64)
+        self._history = buf[-(self.taps - 1):].copy()
+        if len(outs) == 0:
+            return b''
+        self._next_out = last_out + 1
+
+        t = outs * self.down
+        newest = t // self.up - buf_start
+        idx = newest[:, None] - np.arange(self.taps)[None, :]
+        y = np.einsum('nk,nk->n', buf[idx], self.bank[t % self.up])
+        return np.clip(np.rint(y), -32768, 32767).astype(np.int16).tobytes()
+
+
+def resample_pcm(pcm, src_rate, dst_rate=RECOGNIZER_RATE):
+    """
+    Resample a complete int16 mono PCM recording in one call.
+    """
+    return StreamingResampler(src_rate, dst_rate).process(pcm)
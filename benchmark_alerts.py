@@ -0,0 +1,395 @@
+"""
+End-to-end alert latency benchmark.
+
+Runs the detection path (capture pipeline, recognition, phrase match) and the
+trigger path (location, evidence start, SMS, email and call through the
+incident manager and alert outbox) against local stand-ins for the Twilio
+REST API and an SMTP server, so no real accounts are needed. Latency and
+faults of every stand-in can be injected. Results are printed as JSON with
+p50/p95/p99 per stage and can be appended to a JSON-lines file to track
+them over time:
+
+    python benchmark_alerts.py --iterations 50 --twilio-latency-ms 120 \\
+        --smtp-latency-ms 300 --fault-rate 0.1 --output bench.jsonl
+"""
+import os
+import sys
+import json
+import time
+import wave
+import random
+import argparse
+import datetime
+import tempfile
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+STAGES = ("capture", "recognition", "match", "location", "evidence_start",
+          "sms", "email", "call", "first_contact", "all_channels")
+
+
+# --- Local stand-ins ---
+class FakeTwilioHandler(BaseHTTPRequestHandler):
+    """
+    Minimal Twilio REST API: account fetch, Messages.json and Calls.json.
+    """
+
+    latency = 0.0
+    fault_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.latency)
+        if random.random() < self.fault_rate:
+            self._reply(500, {'code': 20500, 'message': 'Injected fault', 'status': 500})
+            return
+        path = self.path.split('?')[0]
+        if path.endswith('/Messages.json'):
+            self._reply(201, {'sid': 'SM' + os.urandom(16).hex(), 'status': 'queued'})
+        elif path.endswith('/Calls.json'):
+            self._reply(201, {'sid': 'CA' + os.urandom(16).hex(), 'status': 'queued'})
+        else:
+            self._reply(200, {'sid': path.rsplit('/', 1)[-1].replace('.json', ''), 'status': 'active'})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP server that accepts everything (no TLS); DATA is delayed by
+    `latency` and refused with 451 at `fault_rate`.
+    """
+
+    latency = 0.0
+    fault_rate = 0.0
+
+    def handle(self):
+        def reply(line):
+            self.wfile.write((line + '\r\n').encode())
+
+        reply('220 benchmark SMTP ready')
+        in_data = False
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    time.sleep(self.latency)
+                    reply('451 Injected fault' if random.random() < self.fault_rate else '250 Queued')
+                continue
+            command = line[:4].upper()
+            if command == 'EHLO':
+                reply('250-benchmark')
+                reply('250 AUTH PLAIN LOGIN')
+            elif command == 'HELO':
+                reply('250 benchmark')
+            elif command == 'AUTH':
+                reply('235 Authenticated')
+            elif command == 'DATA':
+                in_data = True
+                reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                reply('221 Bye')
+                return
+            else:
+                reply('250 OK')
+
+
+class FakeAudioDevice:
+    """
+    Stands in for the microphone: feeds low-level noise to subscribers in
+    real time, with the same interface as AudioDeviceManager.
+    """
+
+    def __init__(self, rate, chunk=1024, sample_width=2):
+        self.rate = rate
+        self.chunk = chunk
+        self.sample_width = sample_width
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name="fake-audio", daemon=True).start()
+
+    def subscribe(self, callback):
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = callback
+            return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def shutdown(self):
+        with self._lock:
+            self._subscribers = {}
+
+    def _run(self):
+        rng = np.random.default_rng(0)
+        interval = self.chunk / self.rate
+        while True:
+            data = rng.normal(0, 50, self.chunk).astype(np.int16).tobytes()
+            with self._lock:
+                callbacks = list(self._subscribers.values())
+            for callback in callbacks:
+                callback(data)
+            time.sleep(interval)
+
+
+def start_server(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+# --- Measurements ---
+def percentiles(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = np.sort(np.asarray(samples)) * 1000
+    return {
+        'count': len(ordered),
+        'mean_ms': round(float(ordered.mean()), 3),
+        'p50_ms': round(float(np.percentile(ordered, 50)), 3),
+        'p95_ms': round(float(np.percentile(ordered, 95)), 3),
+        'p99_ms': round(float(np.percentile(ordered, 99)), 3),
+        'max_ms': round(float(ordered[-1]), 3),
+    }
+
+
+def synthetic_window(rate, seconds):
+    """
+    A voiced-looking test window: a few harmonics with a syllable envelope.
+    """
+    t = np.arange(int(rate * seconds)) / rate
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((140, 280, 420, 560)))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    return (voice * envelope * 3000).astype(np.int16).tobytes()
+
+
+def load_audio(path, rate):
+    from audio_resample import resample_pcm
+    with wave.open(path, 'rb') as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise SystemExit("--audio must be a mono 16-bit WAV file")
+        pcm = wf.readframes(wf.getnframes())
+        return resample_pcm(pcm, wf.getframerate(), rate)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--phrase', default="help me lotus")
+    parser.add_argument('--twilio-latency-ms', type=float, default=80)
+    parser.add_argument('--smtp-latency-ms', type=float, default=150)
+    parser.add_argument('--location-latency-ms', type=float, default=400,
+                        help="latency of the background IP lookup (off the alert path)")
+    parser.add_argument('--recognition-latency-ms', type=float, default=600,
+                        help="simulated recognizer latency when --recognizer is not given")
+    parser.add_argument('--fault-rate', type=float, default=0.0,
+                        help="probability that a Twilio request or SMTP message fails")
+    parser.add_argument('--recognizer', help="benchmark a real backend (google, vosk) instead of a simulated one")
+    parser.add_argument('--audio', help="mono 16-bit WAV of the phrase for --recognizer")
+    parser.add_argument('--evidence-seconds', type=float, default=1)
+    parser.add_argument('--timeout', type=float, default=60, help="per-iteration limit for all channels")
+    parser.add_argument('--output', help="append the JSON result as one line to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    FakeTwilioHandler.latency = args.twilio_latency_ms / 1000
+    FakeTwilioHandler.fault_rate = args.fault_rate
+    FakeSMTPHandler.latency = args.smtp_latency_ms / 1000
+    FakeSMTPHandler.fault_rate = args.fault_rate
+    twilio_port = start_server(ThreadingHTTPServer(('127.0.0.1', 0), FakeTwilioHandler))
+    smtp_server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeSMTPHandler)
+    smtp_server.daemon_threads = True
+    smtp_port = start_server(smtp_server)
+
+    # The app modules read their settings at import time, so configure them first
+    # and keep evidence.db and recordings in a scratch directory
+    os.environ.update({
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32, 'TWILIO_AUTH_TOKEN': 'benchmark',
+        'TWILIO_PHONE': '+15005550006', 'RECIPIENT_PHONE_NUMBER': '+15005550001',
+        'TWILIO_KEEPALIVE_SECONDS': '0',
+        'SMTP_HOST': '127.0.0.1', 'SMTP_PORT': str(smtp_port), 'SMTP_STARTTLS': '0',
+        'SENDER_EMAIL': 'sentinel@benchmark.local', 'SENDER_PASSWORD': '',
+        'RECIPIENT_EMAIL': 'contact@benchmark.local',
+        'EVIDENCE_CODEC': 'wav', 'EVIDENCE_DB_PATH': 'evidence.db', 'ALERT_RETRY_BASE_SECONDS': '0.05', 'ALERT_RETRY_MAX_SECONDS': '1',
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="sentinel-bench-"))
+
+    from twilio.rest import Client
+    from twilio.http.http_client import TwilioHttpClient
+    import twilio_client
+    import audio_device
+    import incident_manager
+    from audio_evidence import EvidenceRecorder
+    from audio_buffer import AudioRingBuffer, WindowReader
+    from audio_resample import StreamingResampler, RECOGNIZER_RATE
+    from voice_activity import VoiceActivityGate
+    from phrase_matcher import PhraseMatcher
+    from location_utils import LocationService
+    import location_utils
+    from database_utils import init_database
+    from alert_dispatcher import AlertDispatcher, DEFAULT_DEADLINE_SECONDS
+    from alert_outbox import AlertOutbox
+    from sms_alert import send_sms_alert
+    from email_alert import send_email_alert, warm_up_email
+    from app import make_call
+
+    class LocalTwilioHttpClient(TwilioHttpClient):
+        # Sends every Twilio API request to the local stand-in
+        def request(self, method, url, *a, **kw):
+            url = url.replace('https://api.twilio.com', f'http://127.0.0.1:{twilio_port}')
+            return super().request(method, url, *a, **kw)
+
+    twilio_client._client = Client(twilio_client.TWILIO_ACCOUNT_SID, twilio_client.TWILIO_AUTH_TOKEN,
+                                   http_client=LocalTwilioHttpClient(pool_connections=True))
+    audio_device._device = FakeAudioDevice(audio_device.RATE)
+
+    def slow_lookup():
+        time.sleep(args.location_latency_ms / 1000)
+        return (12.9716, 77.5946)
+
+    location_utils._service = LocationService(lookup=slow_lookup)
+    location_utils._service.start()
+    init_database()
+    warm_up_email()
+
+    samples = {stage: [] for stage in STAGES}
+    failures = {'sms': 0, 'email': 0, 'call': 0, 'incomplete': 0}
+    current = {}
+    current_lock = threading.Lock()
+
+    def timed_channel(name, send):
+        def wrapper(*send_args):
+            result = send(*send_args)
+            with current_lock:
+                if result and name not in current['acks']:
+                    current['acks'][name] = time.perf_counter() - current['start']
+                    if len(current['acks']) == 3:
+                        current['done'].set()
+                elif not result:
+                    failures[name] += 1
+            return result
+        return wrapper
+
+    def timed_evidence(location_url=None, transcription=None):
+        started = time.perf_counter()
+        recorder = EvidenceRecorder(seconds=args.evidence_seconds, location_url=location_url,
+                                    transcription=transcription)
+        recorder.start()
+        samples['evidence_start'].append(time.perf_counter() - started)
+        return recorder
+
+    incident_manager.record_evidence_audio = timed_evidence
+    dispatcher = AlertDispatcher({
+        'sms': (timed_channel('sms', send_sms_alert), DEFAULT_DEADLINE_SECONDS),
+        'email': (timed_channel('email', send_email_alert), DEFAULT_DEADLINE_SECONDS),
+        'call': (timed_channel('call', lambda location_link: make_call()), DEFAULT_DEADLINE_SECONDS),
+    })
+    outbox = AlertOutbox(dispatcher, concurrency={'sms': 2})
+    outbox.start()
+    # Every iteration is its own incident
+    incidents = incident_manager.IncidentManager(outbox, window_seconds=-1)
+
+    if args.recognizer:
+        from recognizers import get_recognizer
+        if not args.audio:
+            raise SystemExit("--recognizer needs --audio")
+        recognizer = get_recognizer(args.recognizer)
+        recognizer.warm_up()
+        phrase_pcm = load_audio(args.audio, RECOGNIZER_RATE)
+
+        def recognize(pcm):
+            return recognizer.transcribe_alternatives(phrase_pcm, RECOGNIZER_RATE, 2)
+    else:
+        def recognize(pcm):
+            time.sleep(args.recognition_latency_ms / 1000)
+            return [(args.phrase, 0.92)]
+
+    matcher = PhraseMatcher(args.phrase)
+    window_seconds = 5.0
+    capture_pcm = synthetic_window(audio_device.RATE, window_seconds)
+    chunk_bytes = 1024 * 2
+    time.sleep(0.5)  # Let the location cache and SMTP session warm up
+
+    for i in range(args.iterations):
+        # Capture: resample, buffer, cut the window and gate it, as the detector does
+        started = time.perf_counter()
+        ring = AudioRingBuffer(RECOGNIZER_RATE)
+        resampler = StreamingResampler(audio_device.RATE, RECOGNIZER_RATE)
+        reader = WindowReader(ring, window_seconds, window_seconds)
+        for offset in range(0, len(capture_pcm), chunk_bytes):
+            ring.write(resampler.process(capture_pcm[offset:offset + chunk_bytes]))
+        ring.close()
+        window = reader.next_window()
+        if window is not None:
+            VoiceActivityGate(RECOGNIZER_RATE).is_speech(window[1])
+        samples['capture'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        alternatives = recognize(window[1] if window else b'')
+        samples['recognition'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        confidence, text = matcher.match(alternatives)
+        samples['match'].append(time.perf_counter() - started)
+        if confidence < matcher.threshold:
+            print(f"⚠️ Iteration {i}: phrase not matched (confidence {confidence:.2f})")
+
+        # Trigger path, as trigger_alerts / main.dispatch_alerts run it
+        with current_lock:
+            current.update(start=time.perf_counter(), acks={}, done=threading.Event())
+        started = time.perf_counter()
+        location_link = location_utils.get_location_link()
+        samples['location'].append(time.perf_counter() - started)
+        incidents.handle_trigger(location_link, location_url=location_link, transcription=text)
+
+        if not current['done'].wait(args.timeout):
+            failures['incomplete'] += 1
+        with current_lock:
+            acks = dict(current['acks'])
+        for name, latency in acks.items():
+            samples[name].append(latency)
+        if acks:
+            samples['first_contact'].append(min(acks.values()))
+        if len(acks) == 3:
+            samples['all_channels'].append(max(acks.values()))
+
+    outbox.stop()
+    result = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'stages': {stage: percentiles(samples[stage]) for stage in STAGES},
+        'failed_attempts': failures,
+    }
+    print(json.dumps(result, indent=2))
+    if output:
+        with open(output, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
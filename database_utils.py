@@ -1,86 +1,354 @@
 import sqlite3
 import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 import hashlib
+from dotenv import load_dotenv
 
-# --- Admin User Management ---
-def hash_password(password):
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+# Load environment variables from .env file
+load_dotenv()
 
-def init_database():
+# Database file, shared by the GUI, the Flask pages and the background threads
+DB_PATH = os.getenv("EVIDENCE_DB_PATH", "evidence.db")
+DB_TIMEOUT_SECONDS = 10    # How long a statement waits for a lock held by another connection
+CACHED_STATEMENTS = 256    # Prepared statements kept per connection
+MAX_IDLE_CONNECTIONS = 8   # Idle connections kept open for reuse
+
+# WAL lets readers keep reading while the writer commits; NORMAL sync is
+# crash-safe in WAL mode (only a power cut can lose the last commits)
+DB_SYNCHRONOUS = os.getenv("EVIDENCE_DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_KB = 8192         # Page cache per connection
+WRITE_BATCH_SIZE = 64      # Most queued writes committed in one transaction
+PAGE_SIZE = 100            # Rows per page for get_logs_page / get_users_page
+
+# --- Connection Pool ---
+_local = threading.local()
+_idle_connections = []
+_pool_lock = threading.Lock()
+
+def _connect(isolation_level=''):
+    conn = sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT_SECONDS, cached_statements=CACHED_STATEMENTS,
+                           check_same_thread=False, isolation_level=isolation_level)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA synchronous={DB_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA cache_size=-{DB_CACHE_KB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+def get_connection():
+    """
+    Return this thread's database connection, reusing an open one from the
+    pool when possible so callers skip the connect and schema parse. The
+    connection belongs to the thread until release_connection().
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        with _pool_lock:
+            conn = _idle_connections.pop() if _idle_connections else None
+        if conn is None:
+            conn = _connect()
+        _local.conn = conn
+    return conn
+
+def release_connection():
     """
-    Initialize the SQLite database and create the audio_logs, admin_users, and pending_admins tables if they don't exist.
+    Give this thread's connection back to the pool, rolling back anything
+    left uncommitted by an error. Safe to call when none is held.
     """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        return
+    _local.conn = None
     try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.close()
+        return
+    with _pool_lock:
+        if len(_idle_connections) < MAX_IDLE_CONNECTIONS:
+            _idle_connections.append(conn)
+            return
+    conn.close()
 
-        # Create audio_logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS audio_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                location_url TEXT,
-                transcription TEXT
-            )
-        ''')
+# --- Single Writer ---
+class DatabaseWriter:
+    """
+    The only thread that writes to the database.
 
-        # Create admin_users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL
-            )
-        ''')
+    Callers hand it a function taking a cursor and wait for the result.
+    Whatever has queued up while the previous transaction was committing
+    is run as one batch in a single transaction, each write inside its own
+    savepoint so a failing write is undone alone and its exception is
+    raised in the caller. With one writer there is no lock contention
+    between the GUI, Flask and evidence threads, and under load many
+    writes share a single commit.
+    """
 
-        # Create pending_admins table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pending_admins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL
-            )
-        ''')
+    def __init__(self, batch_size=WRITE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
 
-        # Create users table (general users who sign up via web)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                address TEXT,
-                password_hash TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        ''')
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, write):
+        """
+        Queue `write(cursor)`; returns a Future for its return value.
+        """
+        self.start()
+        future = Future()
+        self._queue.put((write, future))
+        return future
+
+    def run(self, write):
+        """
+        Run `write(cursor)` on the writer thread and return its result.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("DatabaseWriter.run() called from the writer thread")
+        return self.submit(write).result()
 
-        # Ensure address column exists (for upgrades)
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None:
+                    conn = _connect(isolation_level=None)
+                self._commit_batch(conn, batch)
+            except Exception as e:
+                print(f"❌ Database write batch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if conn is not None:
+                    conn.close()
+                    conn = None
+
+    def _commit_batch(self, conn, batch):
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        results = []
         try:
-            cursor.execute("SELECT address FROM users LIMIT 1")
+            for write, future in batch:
+                cursor.execute('SAVEPOINT write')
+                try:
+                    results.append((future, write(cursor), None))
+                    cursor.execute('RELEASE write')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write')
+                    cursor.execute('RELEASE write')
+                    results.append((future, None, e))
+            cursor.execute('COMMIT')
         except Exception:
-            cursor.execute("ALTER TABLE users ADD COLUMN address TEXT")
-        
-        # Ensure unique index on phone (login identifier)
-        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_users_phone ON users(phone)')
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+_writer = DatabaseWriter()
+
+def run_write(write):
+    """
+    Run `write(cursor)` on the database writer thread and return its result.
+    """
+    return _writer.run(write)
+
+# --- Schema Migrations ---
+def _add_column(cursor, table, column, column_type):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def _migrate_core_tables(cursor):
+    # Create audio_logs table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audio_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            location_url TEXT,
+            transcription TEXT
+        )
+    ''')
+
+    # Create admin_users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS admin_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL
+        )
+    ''')
+
+    # Create pending_admins table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pending_admins (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL
+        )
+    ''')
+
+    # Create users table (general users who sign up via web)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            address TEXT,
+            password_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    # Databases from before the address field
+    _add_column(cursor, 'users', 'address', 'TEXT')
+
+    # Ensure unique index on phone (login identifier)
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_users_phone ON users(phone)')
+
+def _migrate_evidence_storage_columns(cursor):
+    for column, column_type in (('codec', 'TEXT'), ('duration_seconds', 'REAL'), ('size_bytes', 'INTEGER')):
+        _add_column(cursor, 'audio_logs', column, column_type)
+
+def _migrate_alert_outbox(cursor):
+    # Every alert is stored here before it is sent
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alert_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT UNIQUE NOT NULL,
+            channel TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_alert_outbox_due ON alert_outbox(channel, status, next_attempt_at)')
+
+def _migrate_time_indexes(cursor):
+    # Newest-first listing and paging walk these indexes instead of sorting the table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_audio_logs_timestamp ON audio_logs(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)')
+
+def _migrate_transcription_search(cursor):
+    # Full-text index over transcriptions, kept in sync with audio_logs by triggers
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS audio_logs_fts USING fts5(
+            transcription, content='audio_logs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS audio_logs_fts_insert AFTER INSERT ON audio_logs BEGIN
+            INSERT INTO audio_logs_fts(rowid, transcription) VALUES (new.id, new.transcription);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS audio_logs_fts_delete AFTER DELETE ON audio_logs BEGIN
+            INSERT INTO audio_logs_fts(audio_logs_fts, rowid, transcription) VALUES ('delete', old.id, old.transcription);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS audio_logs_fts_update AFTER UPDATE OF transcription ON audio_logs BEGIN
+            INSERT INTO audio_logs_fts(audio_logs_fts, rowid, transcription) VALUES ('delete', old.id, old.transcription);
+            INSERT INTO audio_logs_fts(rowid, transcription) VALUES (new.id, new.transcription);
+        END
+    ''')
+    # Index the transcriptions logged before the index existed
+    cursor.execute("INSERT INTO audio_logs_fts(audio_logs_fts) VALUES ('rebuild')")
+
+# Schema version N is reached by applying MIGRATIONS[N - 1]. Only ever append:
+# released migrations must not change. Databases created before versioning
+# start at 0, so every migration tolerates what the old code already created.
+MIGRATIONS = [
+    _migrate_core_tables,
+    _migrate_evidence_storage_columns,
+    _migrate_alert_outbox,
+    _migrate_time_indexes,
+    _migrate_transcription_search,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version():
+    """
+    The schema version of the database file (PRAGMA user_version).
+    """
+    try:
+        conn = get_connection()
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        release_connection()
+
+def migrate_database():
+    """
+    Bring the schema up to SCHEMA_VERSION. Pending migrations run in order
+    in one transaction on the writer thread, so a failure leaves the
+    database at its old version. Returns the list of versions applied.
+    """
+    def write(cursor):
+        # Read again under the write lock: another process may have migrated meanwhile
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        applied = []
+        for number in range(version + 1, SCHEMA_VERSION + 1):
+            MIGRATIONS[number - 1](cursor)
+            applied.append(number)
+        if applied:
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        return applied
+    return run_write(write)
 
-        conn.commit()
+# --- Admin User Management ---
+def hash_password(password):
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+def init_database():
+    """
+    Initialize the SQLite database, applying any schema migrations it is
+    missing. When the schema is current this is a single PRAGMA read.
+    """
+    try:
+        version = get_schema_version()
+        if version > SCHEMA_VERSION:
+            print(f"⚠️ Database schema version {version} is newer than this app ({SCHEMA_VERSION}).")
+        elif version < SCHEMA_VERSION:
+            applied = migrate_database()
+            if applied:
+                print(f"✅ Database schema upgraded to version {SCHEMA_VERSION} (applied {', '.join(map(str, applied))})")
         print("✅ Database initialized successfully!")
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
-    finally:
-        conn.close()
 
 # --- Pending Admin Registration ---
 def register_pending_admin(username, password):
-    try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
-        password_hash = hash_password(password)
+    password_hash = hash_password(password)
+    def write(cursor):
         cursor.execute('INSERT INTO pending_admins (username, password_hash) VALUES (?, ?)', (username, password_hash))
-        conn.commit()
+    try:
+        run_write(write)
         print(f"✅ Pending admin registered: {username}")
         return True
     except sqlite3.IntegrityError:
@@ -89,12 +357,10 @@ def register_pending_admin(username, password):
     except Exception as e:
         print(f"❌ Error registering pending admin: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_pending_admins():
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT id, username FROM pending_admins')
         return cursor.fetchall()
@@ -102,53 +368,49 @@ def get_pending_admins():
         print(f"❌ Error fetching pending admins: {e}")
         return []
     finally:
-        conn.close()
+        release_connection()
 
 def accept_pending_admin(pending_id):
-    try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
+    def write(cursor):
         # Get the pending admin's info
         cursor.execute('SELECT username, password_hash FROM pending_admins WHERE id=?', (pending_id,))
         row = cursor.fetchone()
         if not row:
-            return False
+            return None
         username, password_hash = row
         # Move to admin_users
         cursor.execute('INSERT INTO admin_users (username, password_hash) VALUES (?, ?)', (username, password_hash))
         # Remove from pending_admins
         cursor.execute('DELETE FROM pending_admins WHERE id=?', (pending_id,))
-        conn.commit()
+        return username
+    try:
+        username = run_write(write)
+        if username is None:
+            return False
         print(f"✅ Pending admin accepted: {username}")
         return True
     except Exception as e:
         print(f"❌ Error accepting pending admin: {e}")
         return False
-    finally:
-        conn.close()
 
 def delete_pending_admin(pending_id):
-    try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
+    def write(cursor):
         cursor.execute('DELETE FROM pending_admins WHERE id=?', (pending_id,))
-        conn.commit()
+    try:
+        run_write(write)
         print(f"✅ Pending admin deleted: {pending_id}")
         return True
     except Exception as e:
         print(f"❌ Error deleting pending admin: {e}")
         return False
-    finally:
-        conn.close()
 
 # --- Approved Admins ---
 def register_admin(username, password):
-    try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
-        password_hash = hash_password(password)
+    password_hash = hash_password(password)
+    def write(cursor):
         cursor.execute('INSERT INTO admin_users (username, password_hash) VALUES (?, ?)', (username, password_hash))
-        conn.commit()
+    try:
+        run_write(write)
         print(f"✅ Admin registered: {username}")
         return True
     except sqlite3.IntegrityError:
@@ -157,12 +419,10 @@ def register_admin(username, password):
     except Exception as e:
         print(f"❌ Error registering admin: {e}")
         return False
-    finally:
-        conn.close()
 
 def verify_admin(username, password):
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
         password_hash = hash_password(password)
         cursor.execute('SELECT * FROM admin_users WHERE username=? AND password_hash=?', (username, password_hash))
@@ -172,67 +432,276 @@ def verify_admin(username, password):
         print(f"❌ Error verifying admin: {e}")
         return False
     finally:
-        conn.close()
+        release_connection()
 
-def insert_audio_log(filename, location_url=None, transcription=None):
+def insert_audio_log(filename, location_url=None, transcription=None, codec=None, duration_seconds=None, size_bytes=None):
     """
     Insert a new audio log entry into the database.
-    
+
     Args:
         filename (str): Name of the audio file
         location_url (str, optional): Google Maps URL of the location
         transcription (str, optional): Transcribed text from the audio
+        codec (str, optional): Storage codec of the file ("wav", "flac")
+        duration_seconds (float, optional): Length of the recording
+        size_bytes (int, optional): Size of the stored file
     """
-    try:
-        conn = sqlite3.connect('evidence.db')
-        cursor = conn.cursor()
-
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def write(cursor):
         cursor.execute('''
-            INSERT INTO audio_logs (filename, timestamp, location_url, transcription)
-            VALUES (?, ?, ?, ?)
-        ''', (filename, timestamp, location_url, transcription))
-
-        conn.commit()
+            INSERT INTO audio_logs (filename, timestamp, location_url, transcription, codec, duration_seconds, size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (filename, timestamp, location_url, transcription, codec, duration_seconds, size_bytes))
+    try:
+        run_write(write)
         print(f"✅ Audio log saved to database: {filename}")
     except Exception as e:
         print(f"❌ Error saving to database: {e}")
-    finally:
-        conn.close()
 
 def get_all_logs():
     """
     Retrieve all audio logs from the database.
-    
+
     Returns:
         list: List of tuples containing log entries
     """
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT * FROM audio_logs ORDER BY timestamp DESC')
+        cursor.execute('''
+            SELECT id, filename, timestamp, location_url, transcription, codec, duration_seconds, size_bytes
+            FROM audio_logs ORDER BY timestamp DESC
+        ''')
         logs = cursor.fetchall()
         return logs
     except Exception as e:
         print(f"❌ Error retrieving logs: {e}")
         return []
     finally:
-        conn.close()
+        release_connection()
 
-# --- General Users (Web) ---
-def create_user(name, email, phone, address, password):
+def _fetch_page(select, order_column, order_index, cursor, page_size, conditions, params):
+    """
+    One page of `select` (id first, order_column at `order_index`), newest
+    first by (order_column, id). `cursor` is
+    the (order_value, id) of the last row of the previous page; rows after
+    it are found by an index range seek, so every page costs the same
+    however deep it is.
+    """
+    conditions = list(conditions)
+    params = list(params)
+    if cursor is not None:
+        conditions.append(f"({order_column}, id) < (?, ?)")
+        params.extend(cursor)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    conn = get_connection()
+    db_cursor = conn.cursor()
+    db_cursor.execute(f"{select}{where} ORDER BY {order_column} DESC, id DESC LIMIT ?", params + [page_size])
+    rows = db_cursor.fetchall()
+    next_cursor = (rows[-1][order_index], rows[-1][0]) if len(rows) == page_size else None
+    return rows, next_cursor
+
+def get_logs_page(cursor=None, page_size=PAGE_SIZE, filters=None):
+    """
+    Retrieve one page of audio logs, newest first.
+
+    Args:
+        cursor (tuple, optional): next_cursor returned with the previous page
+        page_size (int): Maximum number of rows to return
+        filters (dict, optional): 'since' / 'until' timestamps
+            ("YYYY-MM-DD HH:MM:SS", inclusive) and 'codec'
+
+    Returns:
+        tuple: (rows, next_cursor); next_cursor is None on the last page
+    """
+    filters = filters or {}
+    conditions, params = [], []
+    if filters.get('since'):
+        conditions.append("timestamp >= ?")
+        params.append(filters['since'])
+    if filters.get('until'):
+        conditions.append("timestamp <= ?")
+        params.append(filters['until'])
+    if filters.get('codec'):
+        conditions.append("codec = ?")
+        params.append(filters['codec'])
     try:
-        conn = sqlite3.connect('evidence.db')
+        return _fetch_page('''
+            SELECT id, filename, timestamp, location_url, transcription, codec, duration_seconds, size_bytes
+            FROM audio_logs''', 'timestamp', 2, cursor, page_size, conditions, params)
+    except Exception as e:
+        print(f"❌ Error retrieving logs: {e}")
+        return [], None
+    finally:
+        release_connection()
+
+def _fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match, the last one
+    as a prefix so results appear while typing. Returns None if there are
+    no words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+def search_transcriptions(query, limit=PAGE_SIZE):
+    """
+    Find audio logs whose transcription contains the words in `query`.
+
+    Returns:
+        list: Log entries (same columns as get_all_logs), best match first
+    """
+    match = _fts_query(query)
+    if match is None:
+        return []
+    try:
+        conn = get_connection()
         cursor = conn.cursor()
-        password_hash = hash_password(password)
-        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+            SELECT audio_logs.id, filename, timestamp, location_url, audio_logs.transcription, codec,
+                   duration_seconds, size_bytes
+            FROM audio_logs_fts JOIN audio_logs ON audio_logs.id = audio_logs_fts.rowid
+            WHERE audio_logs_fts MATCH ? ORDER BY audio_logs_fts.rank LIMIT ?
+        ''', (match, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error searching logs: {e}")
+        return []
+    finally:
+        release_connection()
+
+def delete_audio_log(log_id):
+    """
+    Delete an audio log entry from the database.
+
+    Returns:
+        bool: True if the entry was deleted
+    """
+    def write(cursor):
+        cursor.execute('DELETE FROM audio_logs WHERE id=?', (log_id,))
+    try:
+        run_write(write)
+        return True
+    except Exception as e:
+        print(f"❌ Error deleting from database: {e}")
+        return False
+
+# --- Alert Outbox ---
+def enqueue_alert(idempotency_key, channel, payload):
+    """
+    Store an alert for delivery. An alert whose idempotency key is already
+    in the outbox is not added again.
+
+    Returns:
+        bool: True if a new alert was stored
+    """
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def write(cursor):
+        cursor.execute('''
+            INSERT OR IGNORE INTO alert_outbox (idempotency_key, channel, payload, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (idempotency_key, channel, payload, time.time(), created_at))
+        return cursor.rowcount == 1
+    try:
+        return run_write(write)
+    except Exception as e:
+        print(f"❌ Error storing alert in outbox: {e}")
+        return False
+
+def claim_due_alert(channel, max_age_seconds=None):
+    """
+    Atomically take the next due pending alert for `channel` and mark it as
+    sending, so no other worker picks it up. Pending alerts created more
+    than `max_age_seconds` ago are marked 'expired' instead of being sent.
+
+    Returns:
+        tuple: (id, idempotency_key, payload, attempts) or None
+    """
+    def write(cursor):
+        if max_age_seconds is not None:
+            cutoff = datetime.fromtimestamp(time.time() - max_age_seconds).strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute('''
+                UPDATE alert_outbox SET status='expired', last_error='expired before delivery'
+                WHERE channel=? AND status='pending' AND created_at<?
+            ''', (channel, cutoff))
+            if cursor.rowcount:
+                print(f"⚠️ {cursor.rowcount} {channel} alert(s) expired before delivery; not sending stale alerts.")
+        cursor.execute('''
+            SELECT id, idempotency_key, payload, attempts FROM alert_outbox
+            WHERE channel=? AND status='pending' AND next_attempt_at<=?
+            ORDER BY next_attempt_at, id LIMIT 1
+        ''', (channel, time.time()))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("UPDATE alert_outbox SET status='sending', attempts=attempts+1 WHERE id=?", (row[0],))
+            row = (row[0], row[1], row[2], row[3] + 1)
+        return row
+    try:
+        return run_write(write)
+    except Exception as e:
+        print(f"❌ Error claiming alert from outbox: {e}")
+        return None
+
+def next_alert_due(channel):
+    """
+    Epoch time at which the next pending alert for `channel` is due, or None.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(next_attempt_at) FROM alert_outbox WHERE channel=? AND status='pending'", (channel,))
+        return cursor.fetchone()[0]
+    except Exception as e:
+        print(f"❌ Error reading alert outbox: {e}")
+        return None
+    finally:
+        release_connection()
+
+def finish_alert(alert_id, status, error=None, next_attempt_at=None):
+    """
+    Record the outcome of a delivery attempt: 'sent', 'failed', 'expired',
+    or 'pending' again with the time of the next retry.
+    """
+    sent_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if status == 'sent' else None
+    def write(cursor):
+        cursor.execute('''
+            UPDATE alert_outbox SET status=?, last_error=?, next_attempt_at=COALESCE(?, next_attempt_at), sent_at=?
+            WHERE id=?
+        ''', (status, error, next_attempt_at, sent_at, alert_id))
+    try:
+        run_write(write)
+        return True
+    except Exception as e:
+        print(f"❌ Error updating alert outbox: {e}")
+        return False
+
+def requeue_interrupted_alerts():
+    """
+    Return alerts left in 'sending' by a crash or shutdown to the queue.
+    """
+    def write(cursor):
+        cursor.execute("UPDATE alert_outbox SET status='pending' WHERE status='sending'")
+        return cursor.rowcount
+    try:
+        return run_write(write)
+    except Exception as e:
+        print(f"❌ Error requeueing alerts: {e}")
+        return 0
+
+# --- General Users (Web) ---
+def create_user(name, email, phone, address, password):
+    password_hash = hash_password(password)
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def write(cursor):
         cursor.execute('''
             INSERT INTO users (name, email, phone, address, password_hash, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (name, email, phone, address, password_hash, created_at))
-        conn.commit()
+    try:
+        run_write(write)
         return True
     except sqlite3.IntegrityError:
         # Email or phone already exists
@@ -240,12 +709,10 @@ def create_user(name, email, phone, address, password):
     except Exception as e:
         print(f"❌ Error creating user: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_user_by_phone(phone):
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT id, name, email, phone, address, created_at FROM users WHERE phone=?', (phone,))
         row = cursor.fetchone()
@@ -254,11 +721,11 @@ def get_user_by_phone(phone):
         print(f"❌ Error fetching user: {e}")
         return None
     finally:
-        conn.close()
+        release_connection()
 
 def verify_user(phone, password):
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
         password_hash = hash_password(password)
         cursor.execute('SELECT id FROM users WHERE phone=? AND password_hash=?', (phone, password_hash))
@@ -268,11 +735,11 @@ def verify_user(phone, password):
         print(f"❌ Error verifying user: {e}")
         return False
     finally:
-        conn.close()
+        release_connection()
 
 def get_all_users():
     try:
-        conn = sqlite3.connect('evidence.db')
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT id, name, email, phone, address, created_at FROM users ORDER BY created_at DESC')
         rows = cursor.fetchall()
@@ -281,8 +748,37 @@ def get_all_users():
         print(f"❌ Error fetching users: {e}")
         return []
     finally:
-        conn.close()
+        release_connection()
+
+def get_users_page(cursor=None, page_size=PAGE_SIZE, filters=None):
+    """
+    Retrieve one page of registered users, newest first.
+
+    Args:
+        cursor (tuple, optional): next_cursor returned with the previous page
+        page_size (int): Maximum number of rows to return
+        filters (dict, optional): 'since' / 'until' sign-up times (inclusive)
+
+    Returns:
+        tuple: (rows, next_cursor); next_cursor is None on the last page
+    """
+    filters = filters or {}
+    conditions, params = [], []
+    if filters.get('since'):
+        conditions.append("created_at >= ?")
+        params.append(filters['since'])
+    if filters.get('until'):
+        conditions.append("created_at <= ?")
+        params.append(filters['until'])
+    try:
+        return _fetch_page('SELECT id, name, email, phone, address, created_at FROM users',
+                           'created_at', 5, cursor, page_size, conditions, params)
+    except Exception as e:
+        print(f"❌ Error fetching users: {e}")
+        return [], None
+    finally:
+        release_connection()
 
 if __name__ == '__main__':
     # Initialize database when this module is run directly
-    init_database() 
\ No newline at end of file
+    init_database()
@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+
+# Number of concurrent recognizer calls and how many windows may wait for one
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "3"))
+MAX_PENDING_WINDOWS = int(os.getenv("MAX_PENDING_WINDOWS", "8"))
+
+
+class TranscriptionPool:
+    """
+    Consumes captured windows from a bounded queue with a pool of worker
+    threads, so recognizer round-trips overlap instead of blocking capture.
+
+    `transcribe(pcm)` is called on a worker thread and returns the text (or
+    None if nothing was understood). Results are handed to
+    `on_result(window_start, text)` strictly in window order, one at a time,
+    regardless of which worker finished first.
+    """
+
+    def __init__(self, transcribe, on_result, workers=TRANSCRIBE_WORKERS, max_pending=MAX_PENDING_WINDOWS):
+        self.transcribe = transcribe
+        self.on_result = on_result
+        self.workers = max(1, workers)
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+        self._next_seq = 0
+        self._next_emit = 0
+        self._done = {}
+        self.dropped = 0
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"transcriber-{i}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """
+        Let the workers finish what is queued, then shut them down.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, window_start, pcm):
+        """
+        Queue a window for transcription without blocking the producer. If the
+        queue is full the oldest waiting window is dropped, since fresh audio
+        matters more than stale audio.
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+        item = (seq, window_start, pcm)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    stale = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if stale is None:
+                    # Shutdown marker; put it back and give up on this window
+                    self._queue.put(stale)
+                    self._finish(seq, window_start, None, skipped=True)
+                    return
+                self.dropped += 1
+                print(f"⚠️ Transcription backlog full; dropped window at {stale[1]:.1f}s")
+                self._finish(stale[0], stale[1], None, skipped=True)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            seq, window_start, pcm = item
+            try:
+                text = self.transcribe(pcm)
+            except Exception as e:
+                print(f"❌ Transcription worker error: {e}")
+                text = None
+            self._finish(seq, window_start, text)
+
+    def _finish(self, seq, window_start, text, skipped=False):
+        with self._lock:
+            self._done[seq] = None if skipped else (window_start, text)
+        # Release results in window order; only one thread emits at a time
+        with self._emit_lock:
+            while True:
+                with self._lock:
+                    if self._next_emit not in self._done:
+                        return
+                    result = self._done.pop(self._next_emit)
+                    self._next_emit += 1
+                if result is None:
+                    continue
+                try:
+                    self.on_result(*result)
+                except Exception as e:
+                    print(f"❌ Error handling transcription result: {e}")
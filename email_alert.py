@@ -1,23 +1,174 @@
 import os
+import time
 import smtplib
+import threading
 from email.mime.text import MIMEText
+from alert_dispatcher import AlertNotConfigured
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# SMTP server; point these at a local SMTP stand-in for testing
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "15"))
+# NOOP is sent this often so the server does not drop the idle session; 0 disables
+SMTP_KEEPALIVE_SECONDS = float(os.getenv("SMTP_KEEPALIVE_SECONDS", "60"))
+
+
+class EmailTransport:
+    """
+    Keeps one authenticated SMTP session open between alerts.
+
+    The connection, STARTTLS and login happen once; afterwards each alert is
+    a single mail transaction, to any number of recipients. A keepalive
+    thread sends NOOP while idle, and a session the server has dropped is
+    reopened transparently on the next send.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, username=None, password=None,
+                 starttls=SMTP_STARTTLS, keepalive_seconds=SMTP_KEEPALIVE_SECONDS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.keepalive_seconds = keepalive_seconds
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._keepalive_thread = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            server.ehlo()
+            if self.starttls:
+                server.starttls()  # Secure the connection
+                server.ehlo()
+            if self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._last_used = time.monotonic()
+
+    def _disconnect(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+    def connect(self):
+        """
+        Open the session now (if it is not open) and start the keepalive.
+        """
+        with self._lock:
+            if self._server is None:
+                self._connect()
+            self._start_keepalive()
+
+    def _start_keepalive(self):
+        if self.keepalive_seconds > 0 and self._keepalive_thread is None:
+            self._keepalive_thread = threading.Thread(target=self._keepalive, name="smtp-keepalive", daemon=True)
+            self._keepalive_thread.start()
+
+    def send(self, msg, recipients):
+        """
+        Send `msg` to all `recipients` in one transaction over the open
+        session, reconnecting once if the server has closed it.
+        """
+        with self._lock:
+            self._start_keepalive()
+            for attempt in range(2):
+                if self._server is None:
+                    self._connect()
+                try:
+                    refused = self._server.send_message(msg, to_addrs=recipients)
+                    self._last_used = time.monotonic()
+                    return refused
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    # Stale session; drop it and retry on a fresh one
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def _keepalive(self):
+        while not self._stop.wait(self.keepalive_seconds):
+            with self._lock:
+                if self._server is None or time.monotonic() - self._last_used < self.keepalive_seconds:
+                    continue
+                try:
+                    code, _ = self._server.noop()
+                    if code != 250:
+                        self._disconnect()
+                    else:
+                        self._last_used = time.monotonic()
+                except Exception:
+                    # Reconnect lazily on the next send
+                    self._disconnect()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._disconnect()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_email_transport():
+    """
+    Return the process-wide EmailTransport for SENDER_EMAIL.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = EmailTransport(username=os.getenv("SENDER_EMAIL"), password=os.getenv("SENDER_PASSWORD"))
+        return _transport
+
+def recipient_list():
+    """
+    RECIPIENT_EMAIL may hold several comma-separated addresses.
+    """
+    return [r.strip() for r in os.getenv("RECIPIENT_EMAIL", "").split(",") if r.strip()]
+
+def warm_up_email():
+    """
+    Open and authenticate the SMTP session in the background.
+    """
+    if not (os.getenv("SENDER_EMAIL") and recipient_list()):
+        print("⚠️ Email environment variables not set; email alerts are disabled.")
+        return
+
+    def warm():
+        try:
+            get_email_transport().connect()
+            print("✅ Email session ready.")
+        except Exception as e:
+            print(f"⚠️ Could not pre-connect to {SMTP_HOST}: {e}")
+
+    threading.Thread(target=warm, name="smtp-warmup", daemon=True).start()
+
 def send_email_alert(location_link="Location unavailable", latitude=None, longitude=None):
     """
     Sends an email alert using a Gmail account, including a location link and coordinates.
+    The message goes to every address in RECIPIENT_EMAIL over the persistent SMTP session.
+    Returns True if the server accepted the message. Raises
+    AlertNotConfigured if the sender or recipients are missing.
     """
     sender_email = os.getenv("SENDER_EMAIL")
-    password = os.getenv("SENDER_PASSWORD")
-    recipient_email = os.getenv("RECIPIENT_EMAIL")
+    recipients = recipient_list()
 
     # Check if all required environment variables are set
-    if not all([sender_email, password, recipient_email]):
-        print("❌ Error: Email environment variables not set. Cannot send email.")
-        return
+    if not all([sender_email, recipients]):
+        raise AlertNotConfigured("Email environment variables not set. Cannot send email.")
 
     # Build the emergency message
     body = (
@@ -41,19 +192,18 @@ def send_email_alert(location_link="Location unavailable", latitude=None, longit
     msg = MIMEText(body)
     msg['Subject'] = subject
     msg['From'] = sender_email
-    msg['To'] = recipient_email
+    msg['To'] = ", ".join(recipients)
 
     try:
-        # Connect to Gmail's SMTP server
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls()  # Secure the connection
-            server.login(sender_email, password)
-            server.send_message(msg)
-            print("✅ Email alert sent successfully!")
+        get_email_transport().send(msg, recipients)
+        print("✅ Email alert sent successfully!")
+        return True
     except smtplib.SMTPAuthenticationError:
         print("❌ Failed to send email: Authentication failed. Check your email/password.")
+        return False
     except Exception as e:
         print(f"❌ Failed to send email: {e}")
+        return False
 
 if __name__ == '__main__':
     # This block allows you to test the email functionality directly
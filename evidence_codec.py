@@ -0,0 +1,153 @@
+import os
+import wave
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Storage format for evidence: "flac" (lossless, needs soundfile) or "wav"
+EVIDENCE_CODEC = os.getenv("EVIDENCE_CODEC", "flac").lower()
+# Optional lower sample rate for stored speech (e.g. 16000); 0 keeps the capture rate
+EVIDENCE_SPEECH_RATE = int(os.getenv("EVIDENCE_SPEECH_RATE", "0"))
+ENCODER_WORKERS = int(os.getenv("ENCODER_WORKERS", "1"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_warned_unavailable = False
+
+
+def _soundfile():
+    try:
+        import soundfile
+        return soundfile
+    except ImportError:
+        return None
+
+
+def _read_wav(path):
+    with wave.open(path, 'rb') as wf:
+        return wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+
+
+def _wav_result(path):
+    with wave.open(path, 'rb') as wf:
+        duration = wf.getnframes() / wf.getframerate()
+    return path, 'wav', duration, os.path.getsize(path)
+
+
+def read_audio(path):
+    """
+    Decode an evidence file of any stored codec.
+    Returns (pcm_bytes, rate, channels, sample_width) with 16-bit PCM.
+    """
+    if path.lower().endswith('.wav'):
+        return _read_wav(path)
+    sf = _soundfile()
+    if sf is None:
+        raise RuntimeError("soundfile is required to decode compressed evidence (pip install soundfile)")
+    data, rate = sf.read(path, dtype='int16', always_2d=True)
+    return data.tobytes(), rate, data.shape[1], 2
+
+
+def export_wav(path, dest):
+    """
+    Write evidence stored in any codec to `dest` as a plain WAV file.
+    """
+    pcm, rate, channels, sample_width = read_audio(path)
+    with wave.open(dest, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+
+
+def encode_file(wav_path, codec=EVIDENCE_CODEC, speech_rate=EVIDENCE_SPEECH_RATE):
+    """
+    Convert a finished WAV recording to the storage codec and remove the WAV.
+    Runs in a worker process. Returns (path, codec, duration_seconds, size_bytes)
+    describing the file that was kept.
+    """
+    pcm, rate, channels, sample_width = _read_wav(wav_path)
+    duration = len(pcm) / (rate * channels * sample_width)
+    sf = _soundfile() if codec == 'flac' else None
+    if sf is None or sample_width != 2:
+        if codec != 'wav':
+            print(f"⚠️ Cannot encode {codec}; keeping {wav_path} as WAV.")
+        return _wav_result(wav_path)
+
+    import numpy as np
+    if speech_rate and speech_rate < rate and channels == 1:
+        from audio_resample import resample_pcm
+        pcm, rate = resample_pcm(pcm, rate, speech_rate), speech_rate
+    samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels)
+    out_path = os.path.splitext(wav_path)[0] + '.flac'
+    tmp_path = out_path + '.part'
+    sf.write(tmp_path, samples, rate, format='FLAC', subtype='PCM_16')
+    os.replace(tmp_path, out_path)
+    os.remove(wav_path)
+    return out_path, 'flac', duration, os.path.getsize(out_path)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the GUI process has Tk and audio threads running
+            _executor = ProcessPoolExecutor(max_workers=max(1, ENCODER_WORKERS),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _encoder_available():
+    """
+    Whether the worker could encode EVIDENCE_CODEC. Checked here first so a
+    missing encoder never costs a spawned worker (which re-imports the app).
+    """
+    global _warned_unavailable
+    if EVIDENCE_CODEC == 'flac' and _soundfile() is not None:
+        return True
+    if not _warned_unavailable:
+        _warned_unavailable = True
+        hint = " (pip install soundfile)" if EVIDENCE_CODEC == 'flac' else ""
+        print(f"⚠️ Cannot encode {EVIDENCE_CODEC}{hint}; evidence is kept as WAV.")
+    return False
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def submit_encoding(wav_path, on_done=None):
+    """
+    Encode a finished recording in the background process pool.
+    on_done(path, codec, duration_seconds, size_bytes) is called in this
+    process once the stored file is final (with the WAV itself if encoding
+    failed or is disabled).
+    """
+    def done(future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"❌ Failed to encode {wav_path}: {e}")
+            if isinstance(e, BrokenProcessPool):
+                _reset_executor()
+            result = _wav_result(wav_path)
+        if on_done is not None:
+            on_done(*result)
+
+    if EVIDENCE_CODEC != 'wav' and _encoder_available():
+        try:
+            future = _get_executor().submit(encode_file, wav_path, EVIDENCE_CODEC, EVIDENCE_SPEECH_RATE)
+            future.add_done_callback(done)
+            return future
+        except Exception as e:
+            print(f"❌ Could not start background encoder: {e}")
+    if on_done is not None:
+        on_done(*_wav_result(wav_path))
+    return None
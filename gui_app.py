@@ -8,22 +8,32 @@ from tkinter import filedialog
 from PIL import Image, ImageTk, ImageDraw
 import threading
 import time
-import pyaudio
-import wave
+import numpy as np
 import os
 import datetime
-import speech_recognition as sr
 from sms_alert import send_sms_alert
-from email_alert import send_email_alert
-from audio_evidence import record_evidence_audio
-from location_utils import get_location_link
-from dotenv import load_dotenv
-from twilio.rest import Client
+from email_alert import send_email_alert, warm_up_email
+from audio_evidence import get_pretrigger_buffer
+from location_utils import get_location_link, get_location_service, maps_link
+from audio_device import get_audio_device, CHANNELS, RATE
+from audio_buffer import AudioRingBuffer, WindowReader
+from detection_pipeline import TranscriptionPool
+from voice_activity import VoiceActivityGate
+from recognizers import get_recognizer, RecognizerUnavailable
+from audio_resample import StreamingResampler, resample_pcm, RECOGNIZER_RATE
+from keyword_spotter import KeywordSpotter
+from phrase_matcher import PhraseMatcher
+from alert_dispatcher import AlertDispatcher, AlertNotConfigured, DEFAULT_DEADLINE_SECONDS
+from alert_outbox import AlertOutbox
+from incident_manager import IncidentManager
+from trigger_state import TriggerStateMachine, IDLE, PENDING, DISPATCHING, COOLDOWN, TRIGGERED, REPEATED
+from evidence_codec import export_wav
+from twilio_client import get_twilio_client, warm_up_twilio, TWILIO_PHONE, RECIPIENT_PHONE
 from twilio.twiml.voice_response import VoiceResponse
 from database_utils import (
-    init_database, insert_audio_log, get_all_logs, register_admin, verify_admin,
+    init_database, insert_audio_log, get_logs_page, search_transcriptions, delete_audio_log, register_admin, verify_admin,
     register_pending_admin, get_pending_admins, accept_pending_admin, delete_pending_admin,
-    create_user, verify_user, get_all_users
+    create_user, verify_user, get_users_page
 )
 from flask import Flask, Response as FlaskResponse
 from flask import request, redirect, url_for, session
@@ -66,7 +76,7 @@ def get_precise_location_page():
           fetch('/submit_location', {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({lat: pos.coords.latitude, lng: pos.coords.longitude})
+            body: JSON.stringify({lat: pos.coords.latitude, lng: pos.coords.longitude, accuracy: pos.coords.accuracy})
           }).then(() => {
             document.getElementById('status').innerText = 'Location sent! You can close this tab.';
           });
@@ -83,13 +93,13 @@ def get_precise_location_page():
     return FlaskResponse(html, mimetype='text/html')
 
 # --- Flask route to receive coordinates ---
-precise_location = {'lat': None, 'lng': None}
-
 @flask_app.route('/submit_location', methods=['POST'])
 def submit_location():
     data = request.get_json()
-    precise_location['lat'] = data.get('lat')
-    precise_location['lng'] = data.get('lng')
+    if data.get('lat') is None or data.get('lng') is None:
+        return 'Missing coordinates', 400
+    # Browser fixes are ranked against the IP location by accuracy and age
+    get_location_service().submit_fix(data['lat'], data['lng'], data.get('accuracy'))
     return 'OK'
 
 # --- Auth Pages (Signup/Login/Logout) ---
@@ -212,49 +222,34 @@ def auth_combined_html(error_signup: str, error_login: str):
     return base_html.replace('__LOGIN_ERROR__', login_error_html).replace('__SIGNUP_ERROR__', signup_error_html)
 
 # --- Constants ---
-CHUNK = 1024
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RATE = 44100
 RECORD_SECONDS = 5
-OUTPUT_DIR = "audio_clips"
+HOP_SECONDS = 2.5  # A new RECORD_SECONDS window starts this often
+ENROLL_SECONDS = 3  # Length of each keyword spotter enrollment sample
+LEVEL_METER_INTERVAL = 0.2  # Seconds between microphone level updates in the GUI
+# For local testing, use your local server or ngrok URL
+# Example: url = "http://localhost:5000/voice_alert" or your ngrok URL
+VOICE_ALERT_URL = os.getenv("VOICE_ALERT_URL", "http://localhost:5000/voice_alert")
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 stop_event = threading.Event()
 
 # --- Twilio Phone Call Function ---
 def make_call():
     """
     Makes a phone call using Twilio to play a custom emergency message when the secret phrase is detected.
-    Uses the local Flask /voice_alert endpoint as the TwiML URL.
+    Uses the local Flask /voice_alert endpoint as the TwiML URL and the shared, pre-warmed Twilio client.
+    Raises AlertNotConfigured if the Twilio settings are missing.
     """
-    load_dotenv()
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    twilio_phone = os.getenv("TWILIO_PHONE") or os.getenv("TWILIO_PHONE_NUMBER")
-    recipient_phone = os.getenv("RECIPIENT_PHONE_NUMBER")
-
-    print(f"[DEBUG] TWILIO_ACCOUNT_SID: {account_sid}")
-    print(f"[DEBUG] TWILIO_AUTH_TOKEN: {auth_token}")
-    print(f"[DEBUG] TWILIO_PHONE: {twilio_phone}")
-    print(f"[DEBUG] RECIPIENT_PHONE_NUMBER: {recipient_phone}")
-
-    # For local testing, use your local server or ngrok URL
-    # Example: url = "http://localhost:5000/voice_alert" or your ngrok URL
-    url = os.getenv("VOICE_ALERT_URL", "http://localhost:5000/voice_alert")
-    print(f"[DEBUG] Using TwiML URL: {url}")
+    client = get_twilio_client()
 
     # Check if all required environment variables are set
-    if not all([account_sid, auth_token, twilio_phone, recipient_phone]):
-        print("❌ Error: Twilio environment variables not set. Cannot make phone call.")
-        return
+    if client is None:
+        raise AlertNotConfigured("Twilio environment variables not set. Cannot make phone call.")
 
     try:
-        client = Client(account_sid, auth_token)
         call = client.calls.create(
-            url=url,
-            from_=twilio_phone,
-            to=recipient_phone
+            url=VOICE_ALERT_URL,
+            from_=TWILIO_PHONE,
+            to=RECIPIENT_PHONE
         )
         print(f"✅ Phone call initiated successfully! Call SID: {call.sid}")
         return call.sid
@@ -263,72 +258,125 @@ def make_call():
         return None
 
 # --- Main Monitoring Logic ---
+def transcribe_window(recognizer, pcm, sample_width):
+    """
+    Transcribe one captured window with the configured recognizer backend.
+    The PCM bytes are handed to the recognizer in memory, nothing is written to disk.
+    Returns the n-best list of (text, confidence) pairs, empty if nothing was understood.
+    """
+    try:
+        return recognizer.transcribe_alternatives(pcm, RECOGNIZER_RATE, sample_width)
+    except Exception as e:
+        print(f"Transcription Error: {e}")
+        return []
+
 def monitoring_loop(secret_phrase, app_instance):
     """
     The main logic for listening, transcribing, and alerting.
     This function runs in a separate thread and communicates with the GUI
     through thread-safe callbacks in the app_instance.
+    Audio from the shared microphone stream is buffered continuously in a
+    ring buffer, and overlapping windows are handed to a pool of transcription
+    workers so that recognizer latency never stops the device from listening.
     """
-    audio = pyaudio.PyAudio()
     try:
-        stream = audio.open(format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK)
+        recognizer = get_recognizer()
+    except RecognizerUnavailable as e:
+        app_instance.update_status("🛑 Error: Recognizer unavailable", "red")
+        Messagebox.showerror("Recognizer Error", f"Could not load the speech recognizer: {e}")
+        return
+    device = get_audio_device()
+    sample_width = device.sample_width
+    # Detection runs on 16 kHz audio; only evidence is kept at the full capture rate
+    ring = AudioRingBuffer(RECOGNIZER_RATE, CHANNELS, sample_width)
+    resampler = StreamingResampler(RATE, RECOGNIZER_RATE)
+    # Keeps the last seconds at full rate so evidence includes the phrase itself
+    pre_trigger = get_pretrigger_buffer()
+    try:
+        pre_trigger.acquire()
+        subscriptions = [
+            device.subscribe(lambda data: ring.write(resampler.process(data))),
+            device.subscribe(app_instance.level_meter_callback()),
+        ]
     except OSError as e:
         app_instance.update_status(f"🛑 Error: Mic not found", "red")
         Messagebox.showerror("Microphone Error", f"Could not open microphone: {e}")
         return
+    reader = WindowReader(ring, RECORD_SECONDS, HOP_SECONDS)
 
-    while not stop_event.is_set():
-        app_instance.update_status("🟢 Listening...", "green")
-        frames = [stream.read(CHUNK, exception_on_overflow=False) for _ in range(0, int(RATE / CHUNK * RECORD_SECONDS)) if not stop_event.is_set()]
-
-        if stop_event.is_set(): break
+    matcher = PhraseMatcher(secret_phrase)
+    # Cancel window and alert dispatch run beside capture; listening never pauses
+    def dispatch(context):
+        # Remember whether this trigger opened an incident, for the COOLDOWN status
+        context['incident_new'] = trigger_alerts(context.get('location_link') or get_location_link(), context.get('text'))
 
-        # Transcribe the audio and check for the secret phrase
-        transcription = None
-        # Save the audio to a temporary file for transcription only (not for evidence)
-        temp_filename = os.path.join(OUTPUT_DIR, "temp_clip.wav")
-        with wave.open(temp_filename, 'wb') as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
+    app_instance.trigger = trigger = TriggerStateMachine(dispatch, window_seconds=RECORD_SECONDS)
+    trigger.add_listener(app_instance.on_trigger_transition)
 
-        print(f"Temporary audio for transcription: {temp_filename}")
-
-        r = sr.Recognizer()
-        with sr.AudioFile(temp_filename) as source:
-            try:
-                text = r.recognize_google(r.record(source)).lower()
-                transcription = text
-                app_instance.update_results(f'"{text}"', None)
-                if secret_phrase in text:
-                    app_instance.update_status("✅ Triggered! Waiting to send alerts...", "orange")
-                    location_link = get_location_link()
-                    app_instance.update_results(f'"{text}"', location_link)
-                    # Show disable alert dialog and trigger alerts after 10 seconds if not cancelled
-                    def on_timeout():
-                        if not app_instance.alert_cancelled:
-                            threading.Thread(target=trigger_alerts, args=(location_link,)).start()
-                            app_instance.update_status("✅ Alerts Sent!", "orange")
-                    app_instance.root.after(0, app_instance.show_disable_alert_dialog, on_timeout)
-                    time.sleep(13)  # Wait for dialog and alerts to finish before next listen
-            except (sr.UnknownValueError, sr.RequestError) as e:
-                app_instance.update_results(f"[Audio not understood]", None)
-                print(f"Transcription Error: {e}")
-        # Remove the temporary file after use
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-
-    stream.stop_stream()
-    stream.close()
-    audio.terminate()
-
-def trigger_alerts(location_link):
-    """Function to send all alerts."""
-    send_sms_alert(location_link)
-    send_email_alert(location_link)
-    make_call()  # Make the emergency phone call
-    record_evidence_audio()
+    def on_result(window_start, alternatives):
+        # Called in window order by the transcription pool
+        if stop_event.is_set():
+            return
+        if not alternatives:
+            app_instance.update_results(f"[Audio not understood]", None)
+            return
+        text = alternatives[0][0]
+        app_instance.update_results(f'"{text}"', None)
+        confidence, matched_text = matcher.match(alternatives)
+        if confidence >= matcher.threshold:
+            print(f"✅ Phrase matched with confidence {confidence:.2f}: \"{matched_text}\"")
+            text = matched_text
+            # Served from the background location cache; no lookup on the alert path
+            location_link = get_location_link() if trigger.state == IDLE else None
+            outcome = trigger.detect(window_start, confidence, text, location_link=location_link)
+            if outcome == TRIGGERED:
+                app_instance.update_results(f'"{text}"', location_link)
+            elif outcome == REPEATED:
+                print("⚠️ Secret phrase repeated during the cancel window.")
+
+    pool = TranscriptionPool(lambda pcm: transcribe_window(recognizer, pcm, sample_width), on_result)
+    pool.start()
+    app_instance.vad_gate = gate = VoiceActivityGate(RECOGNIZER_RATE)
+    spotter = app_instance.keyword_spotter
+    app_instance.update_status("🟢 Listening...", "green")
+
+    # This thread is the producer: it only moves windows from capture to the pool
+    while not stop_event.is_set():
+        window = reader.next_window(stop_event)
+        if window is None: break
+        # Silent windows never reach the recognizer
+        if not gate.is_speech(window[1]): continue
+        # Only windows that resemble the enrolled phrase go to full recognition
+        if not spotter.is_candidate(window[1]): continue
+        pool.submit(*window)
+
+    pool.stop(timeout=5)
+    trigger.stop()
+    print(f"🔇 Voice activity gate: {gate.stats()}")
+    print(f"🔎 Keyword spotter: {spotter.stats()}")
+    print(f"📊 Alert dispatch: {alert_dispatcher.stats()}")
+    for subscription in subscriptions:
+        device.unsubscribe(subscription)
+    pre_trigger.release()
+    ring.close()
+    app_instance.update_level(0)
+
+# All channels are sent at once; each gets its own deadline
+alert_dispatcher = AlertDispatcher({
+    'sms': (send_sms_alert, DEFAULT_DEADLINE_SECONDS),
+    'email': (send_email_alert, DEFAULT_DEADLINE_SECONDS),
+    'call': (lambda location_link: make_call(), DEFAULT_DEADLINE_SECONDS),
+})
+# Alerts are stored in evidence.db first and retried until delivered
+alert_outbox = AlertOutbox(alert_dispatcher, concurrency={'sms': 2, 'email': 1, 'call': 1})
+# Repeated triggers within the incident window extend evidence instead of re-alerting
+incident_manager = IncidentManager(alert_outbox)
+
+def trigger_alerts(location_link, transcription=None):
+    """Function to send all alerts (once per incident) and record evidence.
+    Returns False if the trigger joined an open incident and only extended the recording."""
+    _, is_new = incident_manager.handle_trigger(location_link, location_url=location_link, transcription=transcription)
+    return is_new
 
 # --- GUI Application ---
 class SentinelApp:
@@ -341,6 +389,10 @@ class SentinelApp:
         self.admin_username = None
         self.is_main_admin_logged_in = False
         self.current_user_phone = None
+        self.vad_gate = None
+        self.keyword_spotter = None
+        # Delivery status comes from the outbox, not from the trigger state
+        alert_outbox.add_listener(self.on_alert_delivery)
         
         # Use a modern dark theme with custom styling
         style = tb.Style("superhero")
@@ -460,6 +512,17 @@ class SentinelApp:
         
         # Add focus effects to entry
         self.add_entry_focus_effect(self.secret_phrase_entry)
+
+        # Keyword spotter enrollment: record a few samples of the phrase
+        enroll_frame = tb.Frame(phrase_section, style="Card.TFrame")
+        enroll_frame.pack(fill=X)
+        self.keyword_spotter = KeywordSpotter.load(self.secret_phrase_entry.get().strip().lower(), RECOGNIZER_RATE)
+        self.enroll_button = tb.Button(enroll_frame, text="🎤 Enroll Phrase Sample", style="Modern.TButton",
+                                       width=25, command=self.enroll_phrase_sample)
+        self.enroll_button.pack(side=LEFT, padx=(0, 15))
+        self.add_button_hover_animation(self.enroll_button, "#00d4ff", "#00b8e6", "#0099cc")
+        self.enroll_label = tb.Label(enroll_frame, text=self.enrollment_text(), style="Subtitle.TLabel")
+        self.enroll_label.pack(side=LEFT)
         
         # Location section with modern button and hover effects
         location_section = tb.Frame(card, style="Card.TFrame")
@@ -516,7 +579,64 @@ class SentinelApp:
                                      style="Gradient.TLabel", cursor="hand2")
         self.location_label.pack(anchor=W)
         self.add_hover_effect(self.location_label, "#ffffff", "#00d4ff")
-        self.alert_cancelled = False
+
+        # Microphone level meter, fed from the shared audio stream while monitoring
+        self.level_meter = tb.Progressbar(status_section, maximum=100, value=0, bootstyle="success")
+        self.level_meter.pack(fill=X, pady=(10, 0))
+        self.trigger = None
+
+    def enrollment_text(self):
+        count = len(self.keyword_spotter.templates)
+        if count == 0:
+            return "Keyword spotter: no samples enrolled (every window goes to the recognizer)"
+        return f"Keyword spotter: {count} sample(s) enrolled"
+
+    def enroll_phrase_sample(self):
+        """
+        Record one ENROLL_SECONDS sample of the secret phrase for the keyword spotter.
+        """
+        phrase = self.secret_phrase_entry.get().strip().lower()
+        if not phrase:
+            Messagebox.show_warning("Warning", "Secret phrase cannot be empty.")
+            return
+        if hasattr(self, 'monitoring_thread') and self.monitoring_thread.is_alive():
+            Messagebox.show_warning("Warning", "Stop monitoring before enrolling phrase samples.")
+            return
+        if self.keyword_spotter.phrase != phrase:
+            self.keyword_spotter = KeywordSpotter.load(phrase, RECOGNIZER_RATE)
+        spotter = self.keyword_spotter
+        self.enroll_button.config(state=DISABLED)
+        self.enroll_label.config(text=f"🎙️ Say \"{phrase}\" now...")
+
+        def record():
+            device = get_audio_device()
+            frames = []
+            target = int(RATE * ENROLL_SECONDS) * CHANNELS * device.sample_width
+            captured = threading.Event()
+
+            def on_audio(data):
+                if not captured.is_set():
+                    frames.append(data)
+                    if sum(len(f) for f in frames) >= target:
+                        captured.set()
+
+            try:
+                subscription = device.subscribe(on_audio)
+                captured.wait(ENROLL_SECONDS + 5)
+                device.unsubscribe(subscription)
+                spotter.enroll(resample_pcm(b''.join(frames), RATE, RECOGNIZER_RATE))
+                spotter.save()
+                message = self.enrollment_text()
+            except Exception as e:
+                print(f"❌ Failed to enroll phrase sample: {e}")
+                message = "❌ Enrollment failed, try again."
+
+            def finish():
+                self.enroll_label.config(text=message)
+                self.enroll_button.config(state=NORMAL)
+            self.root.after(0, finish)
+
+        threading.Thread(target=record, daemon=True).start()
 
     def add_hover_effect(self, widget, normal_color, hover_color):
         """Add hover effect to any widget"""
@@ -695,10 +815,18 @@ class SentinelApp:
         frame = self.db_frame
         for widget in frame.winfo_children(): widget.destroy()
         tb.Label(frame, text="Audio Evidence Database", font=("Segoe UI", 18, "bold"), bootstyle="primary inverse").pack(pady=(20, 10))
+        # Search by what was said
+        search_frame = tb.Frame(frame)
+        search_frame.pack(fill=X, padx=30)
+        self.db_search_entry = tb.Entry(search_frame, font=("Segoe UI", 12))
+        self.db_search_entry.pack(side=LEFT, fill=X, expand=True, padx=(0, 10))
+        self.db_search_entry.bind("<Return>", lambda event: self.search_db())
+        tb.Button(search_frame, text="🔍 Search", bootstyle="info-outline", width=12, command=self.search_db).pack(side=LEFT, padx=(0, 10))
+        tb.Button(search_frame, text="✖ Clear", bootstyle="secondary-outline", width=10, command=self.build_db_tab).pack(side=LEFT)
         # Table frame for padding and scrollbars
         table_frame = tb.Frame(frame)
         table_frame.pack(fill=BOTH, expand=True, padx=30, pady=10)
-        columns = ("ID", "Filename", "Timestamp", "Location URL", "Transcription")
+        columns = ("ID", "Filename", "Timestamp", "Location URL", "Transcription", "Codec", "Duration", "Size")
         self.db_tree = tb.Treeview(table_frame, columns=columns, show="headings", height=14, bootstyle="dark")
         # Scrollbars
         vsb = tb.Scrollbar(table_frame, orient=VERTICAL, command=self.db_tree.yview)
@@ -710,24 +838,49 @@ class SentinelApp:
         table_frame.grid_rowconfigure(0, weight=1)
         table_frame.grid_columnconfigure(0, weight=1)
         # Set column headings and widths
-        col_widths = [60, 220, 160, 220, 220]
+        col_widths = [60, 220, 160, 220, 220, 60, 80, 80]
         for i, col in enumerate(columns):
             self.db_tree.heading(col, text=col, anchor=W)
             self.db_tree.column(col, width=col_widths[i], anchor=W, stretch=True)
-        # Insert data with striped rows
-        logs = get_all_logs()
-        for idx, row in enumerate(logs):
-            tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-            self.db_tree.insert("", tk.END, values=row, tags=(tag,))
         self.db_tree.tag_configure('evenrow', background="#23272b")
         self.db_tree.tag_configure('oddrow', background="#2c3035")
         # Download and Delete buttons
         btn_frame = tb.Frame(frame)
         btn_frame.pack(pady=10)
+        self.db_more_button = tb.Button(btn_frame, text="⏬ Load more", bootstyle="secondary-outline", width=16, command=self.load_db_page)
+        self.db_more_button.pack(side=LEFT, padx=10)
         tb.Button(btn_frame, text="⬇️ Download", bootstyle="info-outline", width=16, command=self.download_selected_evidence).pack(side=LEFT, padx=10)
         tb.Button(btn_frame, text="🗑️ Delete", bootstyle="danger-outline", width=16, command=self.delete_selected_evidence).pack(side=LEFT, padx=10)
         tb.Button(btn_frame, text="🔄 Refresh", bootstyle="secondary-outline", width=16, command=self.build_db_tab).pack(side=LEFT, padx=10)
         tb.Button(btn_frame, text="🚪 Logout", bootstyle="secondary-outline", width=16, command=self.handle_logout).pack(side=LEFT, padx=10)
+        # Insert the newest page of data with striped rows
+        self.db_cursor = None
+        self.load_db_page()
+
+    def load_db_page(self):
+        """Append the next page of evidence to the database table."""
+        logs, self.db_cursor = get_logs_page(self.db_cursor)
+        self.insert_db_rows(logs)
+        self.db_more_button.config(state=NORMAL if self.db_cursor else DISABLED)
+
+    def search_db(self):
+        """Show the evidence whose transcription matches the search box, best match first."""
+        query = self.db_search_entry.get().strip()
+        if not query:
+            self.build_db_tab()
+            return
+        self.db_tree.delete(*self.db_tree.get_children())
+        self.insert_db_rows(search_transcriptions(query))
+        self.db_cursor = None
+        self.db_more_button.config(state=DISABLED)
+
+    def insert_db_rows(self, logs):
+        start = len(self.db_tree.get_children())
+        for idx, row in enumerate(logs, start):
+            tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
+            duration = f"{row[6]:.0f} s" if row[6] is not None else ""
+            size = f"{row[7] / 1e6:.1f} MB" if row[7] is not None else ""
+            self.db_tree.insert("", tk.END, values=row[:6] + (duration, size), tags=(tag,))
 
     def download_selected_evidence(self):
         selected = self.db_tree.selection()
@@ -739,10 +892,16 @@ class SentinelApp:
         if not os.path.exists(filename):
             Messagebox.show_error("File not found", f"File does not exist: {filename}")
             return
-        save_path = filedialog.asksaveasfilename(defaultextension=".wav", initialfile=os.path.basename(filename), filetypes=[("WAV files", "*.wav")])
+        ext = os.path.splitext(filename)[1].lower()
+        filetypes = [("WAV files", "*.wav")] if ext == ".wav" else [(f"{ext[1:].upper()} files", f"*{ext}"), ("WAV files", "*.wav")]
+        save_path = filedialog.asksaveasfilename(defaultextension=ext, initialfile=os.path.basename(filename), filetypes=filetypes)
         if save_path:
             try:
-                shutil.copy2(filename, save_path)
+                if save_path.lower().endswith(".wav") and ext != ".wav":
+                    # Decode compressed evidence for players that only handle WAV
+                    export_wav(filename, save_path)
+                else:
+                    shutil.copy2(filename, save_path)
                 Messagebox.show_info("Download complete", f"File saved to: {save_path}")
             except Exception as e:
                 Messagebox.show_error("Error", f"Failed to save file: {e}")
@@ -771,16 +930,7 @@ class SentinelApp:
         self.build_db_tab()
 
     def delete_evidence_from_db(self, evidence_id):
-        import sqlite3
-        try:
-            conn = sqlite3.connect('evidence.db')
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM audio_logs WHERE id=?', (evidence_id,))
-            conn.commit()
-        except Exception as e:
-            print(f"❌ Error deleting from database: {e}")
-        finally:
-            conn.close()
+        delete_audio_log(evidence_id)
 
     def handle_logout(self):
         self.is_admin_logged_in = False
@@ -805,6 +955,26 @@ class SentinelApp:
                 self.status_label.config(foreground="#ffffff")
         self.root.after(0, update)
 
+    def update_level(self, level):
+        self.root.after(0, lambda: self.level_meter.config(value=level))
+
+    def level_meter_callback(self):
+        """
+        Returns an audio subscriber that feeds the level meter (peak level,
+        -60..0 dBFS mapped to 0..100) at most every LEVEL_METER_INTERVAL seconds.
+        """
+        last_update = [0.0]
+
+        def on_audio(data):
+            now = time.monotonic()
+            if now - last_update[0] < LEVEL_METER_INTERVAL:
+                return
+            last_update[0] = now
+            peak = int(np.abs(np.frombuffer(data, dtype=np.int16).astype(np.int32)).max(initial=0))
+            db = 20 * np.log10(max(peak, 1) / 32768)
+            self.update_level(max(0.0, min(100.0, (db + 60) * 100 / 60)))
+        return on_audio
+
     def update_results(self, transcription, location_link):
         self.root.after(0, lambda: self.transcription_label.config(text=f"Last Transcription: {transcription}"))
         if location_link:
@@ -816,10 +986,15 @@ class SentinelApp:
             Messagebox.show_warning("Warning", "Secret phrase cannot be empty.")
             return
 
+        if self.keyword_spotter.phrase != secret_phrase:
+            self.keyword_spotter = KeywordSpotter.load(secret_phrase, RECOGNIZER_RATE)
+            self.enroll_label.config(text=self.enrollment_text())
+
         stop_event.clear()
         self.start_button.config(state=DISABLED)
         self.stop_button.config(state=NORMAL)
         self.secret_phrase_entry.config(state=DISABLED)
+        self.enroll_button.config(state=DISABLED)
         Messagebox.show_info("Monitoring Started", "Silent Sentinel is now listening.")
         
         self.monitoring_thread = threading.Thread(target=monitoring_loop, args=(secret_phrase, self))
@@ -831,15 +1006,56 @@ class SentinelApp:
         self.start_button.config(state=NORMAL)
         self.stop_button.config(state=DISABLED)
         self.secret_phrase_entry.config(state=NORMAL)
+        self.enroll_button.config(state=NORMAL)
         self.update_status("🛑 Monitoring Stopped", "red")
         self.update_results("--", "--")
 
-    def show_disable_alert_dialog(self, on_timeout_callback):
+    def on_trigger_transition(self, old_state, new_state, reason, context):
+        """
+        Trigger state machine listener; runs on whichever thread caused the
+        transition, so all GUI work is scheduled on the Tk thread.
+        """
+        print(f"🔔 Trigger: {old_state} -> {new_state} ({reason})")
+        if new_state == PENDING:
+            if incident_manager.would_join():
+                self.update_status("🎙️ Triggered again! Evidence recording will be extended...", "orange")
+            else:
+                self.update_status("✅ Triggered! Waiting to send alerts...", "orange")
+            self.root.after(0, self.show_disable_alert_dialog, self.trigger)
+        elif new_state == DISPATCHING:
+            if incident_manager.would_join():
+                self.update_status("🎙️ Extending evidence recording...", "orange")
+            elif reason == "escalated":
+                self.update_status("🚨 Phrase repeated! Sending alerts now...", "red")
+            else:
+                self.update_status("🚨 Sending alerts...", "orange")
+        elif new_state == COOLDOWN and context.get('incident_new') is False:
+            self.update_status("🎙️ Evidence recording extended (alerts already sent for this incident)", "orange")
+        elif new_state == COOLDOWN:
+            # Queued is not delivered: on_alert_delivery reports each channel's actual outcome
+            self.update_status("📨 Alerts queued, waiting for delivery...", "orange")
+        elif new_state == IDLE and not stop_event.is_set():
+            self.update_status("🟢 Listening...", "green")
+
+    def on_alert_delivery(self, channel, key, status, error):
+        """
+        Alert outbox listener; reports what each channel actually did.
+        """
+        if status == 'sent':
+            self.update_status(f"✅ {channel.upper()} alert delivered", "green")
+        elif status == 'retrying':
+            self.update_status(f"⚠️ {channel.upper()} alert not delivered yet, retrying...", "orange")
+        else:
+            self.update_status(f"❌ {channel.upper()} alert failed: {error}", "red")
+
+    def show_disable_alert_dialog(self, trigger):
         """
-        Shows a dialog with a 10-second countdown and a 'Disable Alert' button.
-        If not disabled within 10 seconds, triggers the callback.
+        Shows a dialog with the cancel-window countdown and a 'Disable Alert'
+        button. The trigger state machine owns the timing; the dialog closes
+        itself as soon as the trigger leaves the pending state.
         """
-        self.alert_cancelled = False
+        if trigger.state != PENDING:
+            return
         dialog = tk.Toplevel(self.root)
         dialog.title("Alert Triggered!")
         dialog.geometry("350x150")
@@ -848,32 +1064,37 @@ class SentinelApp:
         dialog.focus_set()
         dialog.transient(self.root)
 
-        label = tb.Label(dialog, text="Secret phrase detected!\nYou have 10 seconds to disable the alert.", font=("Helvetica", 12))
+        if incident_manager.would_join():
+            # Alerts for the open incident already went out; this trigger sends nothing new
+            dialog.geometry("420x170")
+            text = (f"Secret phrase detected again!\nThis trigger only extends the evidence recording;\n"
+                    f"no new alerts will be sent. {trigger.cancel_seconds} seconds to disable it.")
+        else:
+            text = f"Secret phrase detected!\nYou have {trigger.cancel_seconds} seconds to disable the alert."
+        label = tb.Label(dialog, text=text, font=("Helvetica", 12))
         label.pack(pady=10)
 
-        countdown_var = tk.StringVar(value="10")
+        countdown_var = tk.StringVar(value=str(trigger.cancel_seconds))
         countdown_label = tb.Label(dialog, textvariable=countdown_var, font=("Helvetica", 24, "bold"), foreground="red")
         countdown_label.pack(pady=5)
 
         def disable_alert():
-            self.alert_cancelled = True
+            trigger.cancel()
             dialog.destroy()
 
         disable_btn = tb.Button(dialog, text="Disable Alert", command=disable_alert)
         disable_btn.pack(pady=10)
 
-        def countdown(count):
-            if self.alert_cancelled:
+        def countdown():
+            if not dialog.winfo_exists():
                 return
-            countdown_var.set(str(count))
-            if count > 0:
-                dialog.after(1000, countdown, count-1)
-            else:
+            if trigger.state != PENDING:
                 dialog.destroy()
-                if not self.alert_cancelled:
-                    on_timeout_callback()
+                return
+            countdown_var.set(str(int(trigger.remaining() + 0.999)))
+            dialog.after(200, countdown)
 
-        countdown(10)
+        countdown()
 
     # --- User Auth Modal (Login / Create Account) ---
     def show_user_auth_modal(self):
@@ -1156,18 +1377,19 @@ class SentinelApp:
     def open_precise_location_page(self):
         # Open the local Flask page in the browser (correct port 5050)
         webbrowser.open_new_tab("http://localhost:5050/get_precise_location")
-        # Start polling for location
-        self.root.after(1000, self.check_precise_location)
-
-    def check_precise_location(self):
-        from gui_app import precise_location
-        if precise_location['lat'] is not None and precise_location['lng'] is not None:
-            lat, lng = precise_location['lat'], precise_location['lng']
-            self.precise_location_label.config(text=f"Precise Location: {lat:.6f}, {lng:.6f}")
+        # Start polling for a fix newer than the one we have
+        previous = get_location_service().latest('browser')
+        self.root.after(1000, self.check_precise_location, previous and previous['time'])
+
+    def check_precise_location(self, previous_time=None):
+        fix = get_location_service().latest('browser')
+        if fix is not None and fix['time'] != previous_time:
+            lat, lng = fix['lat'], fix['lng']
+            self.precise_location_label.config(text=f"Precise Location: {lat:.6f}, {lng:.6f} (±{fix['accuracy']:.0f} m)")
             # Optionally, update the location link as well
-            self.location_label.config(text=f"Location Link: https://www.google.com/maps?q={lat},{lng}")
+            self.location_label.config(text=f"Location Link: {maps_link(lat, lng)}")
         else:
-            self.root.after(1000, self.check_precise_location)
+            self.root.after(1000, self.check_precise_location, previous_time)
 
 @flask_app.route('/test_html')
 def test_html():
@@ -1179,8 +1401,12 @@ def admin_users():
     # Require normal login first
     if not session.get('user_phone'):
         return redirect(url_for('login'))
-    # Simple table of registered users
-    rows = get_all_users()
+    # Simple table of registered users, one page at a time
+    cursor = None
+    if request.args.get('before') and request.args.get('id', '').isdigit():
+        cursor = (request.args['before'], int(request.args['id']))
+    rows, next_cursor = get_users_page(cursor)
+    next_link = f'<a href="{url_for("admin_users", before=next_cursor[0], id=next_cursor[1])}">Next page</a> | ' if next_cursor else ''
     tr = ''.join([f"<tr><td>{r[0]}</td><td>{r[1]}</td><td>{r[2]}</td><td>{r[3] or ''}</td><td>{r[4] or ''}</td><td>{r[5]}</td></tr>" for r in rows])
     html = f'''
     <html><body style="font-family:sans-serif;background:#111;color:#eee;padding:30px;">
@@ -1189,7 +1415,7 @@ def admin_users():
       <thead><tr><th>ID</th><th>Name</th><th>Email</th><th>Phone</th><th>Address</th><th>Created</th></tr></thead>
       <tbody>{tr}</tbody>
     </table>
-    <p><a href="{url_for('dashboard')}">Back</a></p>
+    <p>{next_link}<a href="{url_for('dashboard')}">Back</a></p>
     </body></html>
     '''
     return FlaskResponse(html, mimetype='text/html')
@@ -1197,6 +1423,14 @@ def admin_users():
 if __name__ == "__main__":
     # Initialize the database
     init_database()
+    # Deliver alerts queued by an earlier run, and any new ones
+    alert_outbox.start()
+
+    # Open the Twilio and SMTP connections now so the first alert does not pay for them
+    warm_up_twilio()
+    warm_up_email()
+    # Keep the location cache fresh in the background
+    get_location_service().start()
     
     # Start Flask app in a separate thread
     def run_flask():
@@ -0,0 +1,70 @@
+import os
+import time
+import uuid
+import threading
+from audio_evidence import record_evidence_audio, EVIDENCE_SECONDS
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Triggers within this many seconds of the previous one belong to the same incident
+INCIDENT_WINDOW_SECONDS = float(os.getenv("INCIDENT_WINDOW_SECONDS", "600"))
+
+
+class IncidentManager:
+    """
+    Groups triggers into incidents so expensive side effects happen once.
+
+    The first trigger opens an incident: evidence recording starts and the
+    alerts are queued in the outbox under the incident id. Any trigger
+    within INCIDENT_WINDOW_SECONDS of the previous one joins that incident;
+    it only extends the running evidence recording (or starts a new one if
+    it has already finished) and sends nothing.
+    """
+
+    def __init__(self, outbox, window_seconds=INCIDENT_WINDOW_SECONDS):
+        self.outbox = outbox
+        self.window_seconds = window_seconds
+        self.current = None
+        self._lock = threading.Lock()
+
+    def would_join(self):
+        """
+        True if a trigger now would join the open incident (and send nothing).
+        """
+        with self._lock:
+            incident = self.current
+            return incident is not None and time.monotonic() - incident['last_trigger'] <= self.window_seconds
+
+    def handle_trigger(self, *alert_args, location_url=None, transcription=None):
+        """
+        Act on a confirmed trigger. `location_url` and `transcription` (the
+        phrase that was heard) are stored with the evidence recording.
+        Returns (incident_id, is_new).
+        """
+        now = time.monotonic()
+        with self._lock:
+            incident = self.current
+            if incident is not None and now - incident['last_trigger'] <= self.window_seconds:
+                incident['triggers'] += 1
+                incident['last_trigger'] = now
+                is_new = False
+            else:
+                incident = {'id': uuid.uuid4().hex, 'started': now, 'last_trigger': now,
+                            'triggers': 1, 'recorder': None}
+                self.current = incident
+                is_new = True
+
+            if is_new:
+                # Start evidence first; it begins with the buffered audio from before the trigger
+                incident['recorder'] = record_evidence_audio(location_url, transcription)
+            elif not incident['recorder'].extend(EVIDENCE_SECONDS, transcription):
+                incident['recorder'] = record_evidence_audio(location_url, transcription)
+
+        if is_new:
+            self.outbox.submit(*alert_args, incident=incident['id'])
+        else:
+            print(f"🔁 Trigger {incident['triggers']} joined incident {incident['id'][:8]}; "
+                  f"evidence recording continued, no new alerts sent.")
+        return incident['id'], is_new
@@ -0,0 +1,183 @@
+import os
+import threading
+import numpy as np
+
+# Keyword spotter settings (16 kHz mono input)
+KWS_TEMPLATES_FILE = "keyword_templates.npz"
+FRAME_MS = 25
+HOP_MS = 10
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+DEFAULT_THRESHOLD = 8.0   # Used until two samples allow a per-user threshold
+THRESHOLD_MARGIN = 2.5    # Lenient on purpose: a false reject is a missed emergency
+TRIM_DB = 30.0            # Enrollment frames this far below the peak are silence
+
+
+def _mel_filterbank(rate, n_fft=N_FFT, n_mels=N_MELS):
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mels = np.linspace(hz_to_mel(0), hz_to_mel(rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / rate).astype(int)
+    fbank = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fbank
+
+
+def _dct_matrix(n_in=N_MELS, n_out=N_MFCC):
+    n = np.arange(n_in)
+    k = np.arange(n_out)[:, None]
+    return np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2 / n_in)
+
+
+def mfcc(samples, rate):
+    """
+    MFCC features (frames x N_MFCC) of a mono signal, computed in one
+    vectorized pass. Also returns per-frame log energy for silence trimming.
+    """
+    frame_len = int(rate * FRAME_MS / 1000)
+    hop = int(rate * HOP_MS / 1000)
+    x = np.asarray(samples, dtype=np.float64)
+    x = np.append(x[:1], x[1:] - 0.97 * x[:-1])  # pre-emphasis
+    if len(x) < frame_len:
+        x = np.pad(x, (0, frame_len - len(x)))
+    n_frames = 1 + (len(x) - frame_len) // hop
+    idx = np.arange(frame_len)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = x[idx] * np.hamming(frame_len)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    energy = 10 * np.log10(np.sum(power, axis=1) + 1e-10)
+    mel = np.log(power @ _mel_filterbank(rate).T + 1e-10)
+    return mel @ _dct_matrix().T, energy
+
+
+def _features(pcm, rate, trim=False):
+    feats, energy = mfcc(np.frombuffer(pcm, dtype=np.int16), rate)
+    voiced = energy > energy.max() - TRIM_DB
+    if trim:
+        where = np.nonzero(voiced)[0]
+        feats, voiced = feats[where[0]:where[-1] + 1], voiced[where[0]:where[-1] + 1]
+    # Drop c0 (loudness) and remove the microphone offset measured on voiced frames,
+    # so templates and windows are normalised the same way
+    feats = feats[:, 1:]
+    return feats - feats[voiced].mean(axis=0)
+
+
+def subsequence_dtw(template, window):
+    """
+    Average per-frame distance of the best alignment of `template` anywhere
+    inside `window`. Each template frame advances the window by 0, 1 or 2
+    frames, so every row of the DTW table is computed in one vector step.
+    """
+    cost = np.sqrt(((template[:, None, :] - window[None, :, :]) ** 2).sum(axis=2))
+    acc = cost[0].copy()
+    inf = np.full(2, np.inf)
+    for i in range(1, len(template)):
+        shifted1 = np.concatenate((inf[:1], acc[:-1]))
+        shifted2 = np.concatenate((inf, acc[:-2]))
+        acc = cost[i] + np.minimum(acc, np.minimum(shifted1, shifted2))
+    return float(acc.min()) / len(template)
+
+
+class KeywordSpotter:
+    """
+    First-stage trigger: MFCC + DTW template matching against enrolled
+    recordings of the user's secret phrase.
+
+    Windows whose best distance is within the threshold escalate to the full
+    recognizer; the rest are dropped. With no enrolled samples every window
+    passes through, so detection still works before enrollment.
+    """
+
+    def __init__(self, phrase, rate=16000, templates=None):
+        self.phrase = phrase
+        self.rate = rate
+        self.templates = list(templates or [])
+        self.windows_escalated = 0
+        self.windows_rejected = 0
+        self._lock = threading.Lock()
+        self._update_threshold()
+
+    def _update_threshold(self):
+        if len(self.templates) < 2:
+            self.threshold = DEFAULT_THRESHOLD
+            return
+        spread = [subsequence_dtw(a, b) if len(a) <= len(b) else subsequence_dtw(b, a)
+                  for i, a in enumerate(self.templates) for b in self.templates[i + 1:]]
+        self.threshold = max(spread) * THRESHOLD_MARGIN
+
+    def enroll(self, pcm):
+        """
+        Add one recording of the phrase (int16 PCM at self.rate) as a template.
+        """
+        with self._lock:
+            self.templates.append(_features(pcm, self.rate, trim=True))
+            self._update_threshold()
+            return len(self.templates)
+
+    def clear(self):
+        with self._lock:
+            self.templates = []
+            self._update_threshold()
+
+    def score(self, pcm):
+        """
+        Smallest template distance for a window (lower is a better match).
+        """
+        window = _features(pcm, self.rate)
+        with self._lock:
+            templates = list(self.templates)
+        return min(subsequence_dtw(t, window) for t in templates)
+
+    def is_candidate(self, pcm):
+        """
+        True if the window should be escalated to the full recognizer.
+        """
+        if not self.templates:
+            return True
+        passed = self.score(pcm) <= self.threshold
+        with self._lock:
+            if passed:
+                self.windows_escalated += 1
+            else:
+                self.windows_rejected += 1
+        return passed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'templates': len(self.templates),
+                'threshold': self.threshold,
+                'windows_escalated': self.windows_escalated,
+                'windows_rejected': self.windows_rejected,
+            }
+
+    def save(self, path=KWS_TEMPLATES_FILE):
+        with self._lock:
+            arrays = {f"t{i}": t for i, t in enumerate(self.templates)}
+        np.savez(path, phrase=np.array(self.phrase), rate=np.array(self.rate), **arrays)
+
+    @classmethod
+    def load(cls, phrase, rate=16000, path=KWS_TEMPLATES_FILE):
+        """
+        Load enrolled templates for `phrase`. Templates recorded for a
+        different phrase or sample rate are ignored.
+        """
+        templates = []
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    if str(data['phrase']) == phrase and int(data['rate']) == rate:
+                        keys = sorted((k for k in data.files if k.startswith('t')), key=lambda k: int(k[1:]))
+                        templates = [data[k] for k in keys]
+            except Exception as e:
+                print(f"❌ Could not load keyword templates: {e}")
+        return cls(phrase, rate, templates)
@@ -1,28 +1,161 @@
+import os
+import time
+import threading
 import geocoder
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
 
 DEFAULT_LOCATION_LINK = "https://www.google.com/maps?q=12.9716,77.5946"  # Set your default location here
 
+# How often the IP-based location is refreshed in the background
+LOCATION_TTL_SECONDS = float(os.getenv("LOCATION_TTL_SECONDS", "300"))
+LOCATION_RETRY_SECONDS = 30   # Sooner retry after a failed lookup
+COLD_START_WAIT_SECONDS = 3   # How long a trigger waits for the very first lookup
+IP_ACCURACY_METERS = 5000     # Typical error of IP geolocation
+BROWSER_ACCURACY_METERS = 50  # Assumed when the browser does not report accuracy
+DRIFT_METERS_PER_SECOND = 1.5 # A fix loses this much accuracy per second of age (walking pace)
+MAX_FIX_AGE_SECONDS = 3600    # Older fixes are ignored entirely
+
+
+def maps_link(latitude, longitude):
+    return f"https://www.google.com/maps?q={latitude},{longitude}"
+
+
+def ip_lookup():
+    """
+    (latitude, longitude) of this machine from its IP address, or None.
+    """
+    g = geocoder.ip('me')
+    if g.ok and g.latlng:
+        return tuple(g.latlng)
+    return None
+
+
+class LocationService:
+    """
+    Keeps the best known location ready so triggers never wait on geolocation.
+
+    A background thread refreshes the IP-based location every
+    LOCATION_TTL_SECONDS. Coordinates posted by the browser page are added
+    with submit_fix(). Fixes are ranked by their estimated error now: the
+    reported accuracy plus DRIFT_METERS_PER_SECOND for every second of age,
+    so a fresh browser fix beats the IP location and a stale one does not.
+    """
+
+    def __init__(self, ttl_seconds=LOCATION_TTL_SECONDS, lookup=ip_lookup):
+        self.ttl_seconds = ttl_seconds
+        self.lookup = lookup
+        self._fixes = {}  # source -> {'lat', 'lng', 'accuracy', 'time'}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name="location-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            ok = self.refresh_ip()
+            self._ready.set()
+            self._stop.wait(self.ttl_seconds if ok else LOCATION_RETRY_SECONDS)
+
+    def refresh_ip(self):
+        """
+        Look up the location from the IP address and cache it.
+        Returns True on success.
+        """
+        try:
+            # Get location using IP address
+            latlng = self.lookup()
+            # Check if coordinates were found
+            if latlng:
+                latitude, longitude = latlng
+                self.submit_fix(latitude, longitude, IP_ACCURACY_METERS, source='ip')
+                return True
+            print("❌ Geolocation failed: Could not determine location from IP.")
+        except Exception as e:
+            print(f"❌ An error occurred during geolocation: {e}.")
+        return False
+
+    def submit_fix(self, latitude, longitude, accuracy=None, source='browser'):
+        """
+        Record a location fix; `accuracy` is the error radius in meters.
+        """
+        if accuracy is None:
+            accuracy = BROWSER_ACCURACY_METERS
+        with self._lock:
+            self._fixes[source] = {'lat': float(latitude), 'lng': float(longitude),
+                                   'accuracy': float(accuracy), 'time': time.time()}
+        self._ready.set()
+
+    def latest(self, source):
+        with self._lock:
+            fix = self._fixes.get(source)
+            return dict(fix) if fix else None
+
+    def best_fix(self):
+        """
+        The fix with the smallest estimated error right now, or None.
+        """
+        now = time.time()
+        best, best_error = None, None
+        with self._lock:
+            for source, fix in self._fixes.items():
+                age = now - fix['time']
+                if age > MAX_FIX_AGE_SECONDS:
+                    continue
+                error = fix['accuracy'] + DRIFT_METERS_PER_SECOND * age
+                if best_error is None or error < best_error:
+                    best, best_error = dict(fix, source=source, age=age), error
+        return best
+
+    def get_link(self):
+        """
+        Google Maps link for the best cached fix. Only waits (briefly) if no
+        lookup has finished yet since startup.
+        """
+        self.start()
+        if not self._ready.is_set():
+            self._ready.wait(COLD_START_WAIT_SECONDS)
+        fix = self.best_fix()
+        if fix is None:
+            print("❌ No location available yet. Using default location.")
+            return DEFAULT_LOCATION_LINK
+        link = maps_link(fix['lat'], fix['lng'])
+        print(f"📍 Location link ({fix['source']}, {fix['age']:.0f}s old): {link}")
+        return link
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_location_service():
+    """
+    Return the process-wide LocationService.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = LocationService()
+        return _service
+
 def get_location_link():
     """
-    Fetches the user's approximate location using their IP address and returns a Google Maps link.
+    Returns a Google Maps link for the user's location from the background
+    location cache, without a network lookup on the caller's thread.
     Falls back to a default location if unavailable.
     """
-    try:
-        # Get location using IP address
-        g = geocoder.ip('me')
-        
-        # Check if coordinates were found
-        if g.ok and g.latlng:
-            latitude, longitude = g.latlng
-            maps_link = f"https://www.google.com/maps?q={latitude},{longitude}"
-            print(f"📍 Location link: {maps_link}")
-            return maps_link
-        else:
-            print("❌ Geolocation failed: Could not determine location from IP. Using default location.")
-            return DEFAULT_LOCATION_LINK
-    except Exception as e:
-        print(f"❌ An error occurred during geolocation: {e}. Using default location.")
-        return DEFAULT_LOCATION_LINK
+    return get_location_service().get_link()
 
 if __name__ == '__main__':
     # This block allows you to test the location functionality directly
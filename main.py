@@ -1,102 +1,178 @@
-import pyaudio
 import wave
 import os
 import datetime
-import speech_recognition as sr
+import threading
 from sms_alert import send_sms_alert
-from email_alert import send_email_alert
-from audio_evidence import record_evidence_audio
-from location_utils import get_location_link
+from email_alert import send_email_alert, warm_up_email
+from audio_evidence import get_pretrigger_buffer
+from location_utils import get_location_link, get_location_service
 from app import make_call
+from twilio_client import warm_up_twilio
+from audio_device import get_audio_device, CHANNELS, RATE
+from audio_buffer import AudioRingBuffer, WindowReader
+from detection_pipeline import TranscriptionPool
+from voice_activity import VoiceActivityGate
+from recognizers import get_recognizer, RecognizerUnavailable
+from audio_resample import StreamingResampler, RECOGNIZER_RATE
+from keyword_spotter import KeywordSpotter
+from phrase_matcher import PhraseMatcher
+from alert_dispatcher import AlertDispatcher, DEFAULT_DEADLINE_SECONDS
+from alert_outbox import AlertOutbox
+from incident_manager import IncidentManager
+from database_utils import init_database
+from trigger_state import TriggerStateMachine, TRIGGERED
+from evidence_codec import submit_encoding
 
 # Constants
-CHUNK = 1024
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RATE = 44100
 RECORD_SECONDS = 5
+HOP_SECONDS = 2.5  # A new RECORD_SECONDS window starts this often
 OUTPUT_DIR = "audio_clips"
+SAVE_CLIPS = False  # Keep a WAV copy of every window in OUTPUT_DIR (debugging only)
 SECRET_PHRASE = "help me lotus"
 
 # Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+if SAVE_CLIPS:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def transcribe_audio(filename):
+def transcribe_audio(pcm, sample_width):
     """
-    Transcribes the given audio file using Google Speech Recognition.
+    Transcribes raw PCM audio with the recognizer selected by RECOGNIZER_BACKEND.
+    The audio is passed to the recognizer in memory. Returns the n-best list
+    of (text, confidence) pairs, empty if nothing was understood.
     """
-    r = sr.Recognizer()
-    with sr.AudioFile(filename) as source:
-        audio_data = r.record(source)
-        try:
-            # Recognize speech using Google Speech Recognition
-            text = r.recognize_google(audio_data)
-            print(f"Transcription: \"{text}\"")
-            return text.lower()
-        except sr.UnknownValueError:
-            print("Google Speech Recognition could not understand audio")
-            return ""
-        except sr.RequestError as e:
-            print(f"Could not request results from Google Speech Recognition service; {e}")
-            return ""
+    recognizer = get_recognizer()
+    try:
+        alternatives = recognizer.transcribe_alternatives(pcm, RECOGNIZER_RATE, sample_width)
+    except Exception as e:
+        print(f"Could not transcribe audio with {recognizer.name}; {e}")
+        return []
+    if not alternatives:
+        print(f"{recognizer.name} recognizer could not understand audio")
+        return []
+    print(f"Transcription: \"{alternatives[0][0]}\"")
+    return alternatives
+
+def save_clip(pcm, sample_width):
+    """
+    Saves a window as a WAV file in OUTPUT_DIR. Only used when SAVE_CLIPS is on.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    filename = os.path.join(OUTPUT_DIR, f"clip_{timestamp}.wav")
+    with wave.open(filename, 'wb') as wf:
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(RECOGNIZER_RATE)
+        wf.writeframes(pcm)
+    print(f"Saved audio: {filename}")
+    # Compress the clip in the background like evidence files
+    submit_encoding(filename)
+    return filename
 
 def record_audio():
-    audio = pyaudio.PyAudio()
+    device = get_audio_device()
+    sample_width = device.sample_width
+    stop_event = threading.Event()
+    pre_trigger = get_pretrigger_buffer()
 
     try:
-        stream = audio.open(format=FORMAT,
-                            channels=CHANNELS,
-                            rate=RATE,
-                            input=True,
-                            frames_per_buffer=CHUNK)
-
-        print("Listening... Press Ctrl+C to stop.")
-
-        while True:
-            frames = []
-            try:
-                # Read audio data, ignoring overflows
-                for _ in range(0, int(RATE / CHUNK * RECORD_SECONDS)):
-                    data = stream.read(CHUNK, exception_on_overflow=False)
-                    frames.append(data)
-            except Exception as e:
-                print(f"⚠️ Audio read error: {e}")
-                continue  # Skip to the next recording cycle
+        # Capture continuously from the shared mic stream; detect on overlapping windows
+        # Windows are resampled to 16 kHz as they are captured
+        ring = AudioRingBuffer(RECOGNIZER_RATE, CHANNELS, sample_width)
+        resampler = StreamingResampler(RATE, RECOGNIZER_RATE)
+        # Last seconds of full-rate audio, so evidence starts before the phrase
+        pre_trigger_ring = pre_trigger.acquire()
+        subscription = device.subscribe(lambda data: ring.write(resampler.process(data)))
+        reader = WindowReader(ring, RECORD_SECONDS, HOP_SECONDS)
 
-            # Save the recorded data as a WAV file
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(OUTPUT_DIR, f"clip_{timestamp}.wav")
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(CHANNELS)
-                wf.setsampwidth(audio.get_sample_size(FORMAT))
-                wf.setframerate(RATE)
-                wf.writeframes(b''.join(frames))
+        def transcribe_window(pcm):
+            alternatives = transcribe_audio(pcm, sample_width)
+            if SAVE_CLIPS:
+                save_clip(pcm, sample_width)
+            return alternatives
 
-            print(f"Saved audio: {filename}")
+        def dispatch_alerts(context):
+            # One incident per burst of triggers: evidence starts (or is extended) first,
+            # then every alert channel is queued; the outbox retries failures
+            location_link = get_location_link()
+            incidents.handle_trigger(location_link, location_url=location_link, transcription=context.get('text'))
 
-            # Transcribe the audio and check for the secret phrase
-            transcription = transcribe_audio(filename)
-            if SECRET_PHRASE in transcription:
-                print("✅ Secret phrase detected! Triggering alerts...")
-                
-                # Get location and trigger alerts
-                location_link = get_location_link()
-                send_sms_alert(location_link)
-                send_email_alert(location_link)
-                make_call()  # Make the emergency phone call
-                record_evidence_audio()
+        def on_result(window_start, alternatives):
+            # Check for the secret phrase; results arrive in window order
+            if not alternatives:
+                # Failed transcriptions arrive as None
+                print("❌ No phrase detected.")
+                return
+            confidence, text = matcher.match(alternatives)
+            if confidence >= matcher.threshold:
+                if trigger.detect(window_start, confidence, text) == TRIGGERED:
+                    print(f"✅ Secret phrase detected (confidence {confidence:.2f})! Triggering alerts...")
             else:
                 print("❌ No phrase detected.")
 
+        dispatcher = AlertDispatcher({
+            'sms': (send_sms_alert, DEFAULT_DEADLINE_SECONDS),
+            'email': (send_email_alert, DEFAULT_DEADLINE_SECONDS),
+            'call': (lambda location_link: make_call(), DEFAULT_DEADLINE_SECONDS),
+        })
+        init_database()
+        outbox = AlertOutbox(dispatcher)
+        outbox.start()
+        incidents = IncidentManager(outbox)
+        # No cancel dialog on the command line: alerts are dispatched at once,
+        # on their own thread, while listening continues
+        trigger = TriggerStateMachine(dispatch_alerts, window_seconds=RECORD_SECONDS, cancel_seconds=0)
+        trigger.add_listener(lambda old, new, reason, context: print(f"🔔 Trigger: {old} -> {new} ({reason})"))
+        matcher = PhraseMatcher(SECRET_PHRASE)
+        pool = TranscriptionPool(transcribe_window, on_result)
+        pool.start()
+        gate = VoiceActivityGate(RECOGNIZER_RATE)
+        # Uses samples enrolled from the GUI; passes everything if there are none
+        spotter = KeywordSpotter.load(SECRET_PHRASE, RECOGNIZER_RATE)
+
+        try:
+            get_recognizer()  # Load the recognizer before the first window arrives
+        except RecognizerUnavailable as e:
+            print(f"❌ {e}")
+            return
+        warm_up_twilio()  # Connect to Twilio and the SMTP server before the first alert
+        warm_up_email()
+        get_location_service().start()  # Refresh the location in the background, not on trigger
+        print("Listening... Press Ctrl+C to stop.")
+
+        # Capture feeds the pool; transcription happens on the worker threads
+        while True:
+            window = reader.next_window(stop_event)
+            if window is None:
+                break
+            # Skip silent windows before any recognizer call
+            if not gate.is_speech(window[1]):
+                continue
+            if not spotter.is_candidate(window[1]):
+                continue
+            pool.submit(*window)
+
     except KeyboardInterrupt:
         print("\nStopped by user.")
 
     finally:
-        # Safely close the stream and terminate PyAudio
-        if 'stream' in locals() and stream.is_active():
-            stream.stop_stream()
-            stream.close()
-        audio.terminate()
+        # Stop the workers, then safely close the stream and terminate PyAudio
+        stop_event.set()
+        if 'pool' in locals():
+            pool.stop(timeout=5)
+        if 'trigger' in locals():
+            trigger.stop()
+        if 'outbox' in locals():
+            outbox.stop()  # Undelivered alerts stay in the outbox for the next run
+        if 'gate' in locals():
+            print(f"🔇 Voice activity gate: {gate.stats()}")
+            print(f"🔎 Keyword spotter: {spotter.stats()}")
+        if 'dispatcher' in locals():
+            print(f"📊 Alert dispatch: {dispatcher.stats()}")
+        if 'subscription' in locals():
+            device.unsubscribe(subscription)
+        if 'pre_trigger_ring' in locals():
+            pre_trigger.release()
+        device.shutdown()
 
 if __name__ == "__main__":
     record_audio() 
\ No newline at end of file
@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+
+MATCH_THRESHOLD = 0.8     # Minimum confidence for a window to trigger
+LETTERS_PER_EDIT = 7      # A phrase word tolerates one misspelling per this many letters
+RANK_DISCOUNT = 0.05      # Confidence lost per rank for alternatives without a score
+
+_SOUNDEX = {c: d for d, letters in {
+    '1': 'bfpv', '2': 'cgjkqsxz', '3': 'dt', '4': 'l', '5': 'mn', '6': 'r'}.items() for c in letters}
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+@lru_cache(maxsize=4096)
+def phonetic(token):
+    """
+    Soundex-style code, so misheard spellings such as sentinel/sentinal compare equal.
+    """
+    if not token:
+        return ''
+    code = token[0]
+    last = _SOUNDEX.get(token[0], '')
+    for c in token[1:]:
+        digit = _SOUNDEX.get(c, '')
+        if digit and digit != last:
+            code += digit
+        if c not in 'hw':
+            last = digit
+    return (code + '000')[:4]
+
+
+def bounded_edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 as soon as it is
+    certain to exceed limit. Only a diagonal band of the table is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        cur = [limit + 1] * (len(b) + 1)
+        cur[0] = i if i <= limit else limit + 1
+        best = cur[0]
+        for j in range(lo, hi + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if cur[j] < best:
+                best = cur[j]
+        if best > limit:
+            return limit + 1
+        prev = cur
+    return min(prev[len(b)], limit + 1)
+
+
+class PhraseMatcher:
+    """
+    Fuzzy matcher for the secret phrase, compiled once per phrase.
+
+    Each recognizer alternative is scanned for the phrase's tokens in order;
+    tokens score 1.0 when equal. A misspelled token only counts if it sounds
+    the same (equal phonetic code) and is within one edit per
+    LETTERS_PER_EDIT letters; it then scores by its edit distance. Words
+    shorter than that must be heard exactly, so near-misses such as
+    lotus/lots or lotus/lettuce never trigger. An exact match always scores
+    1.0; fuzzy matches are weighted by the recognizer's confidence.
+    """
+
+    def __init__(self, phrase, threshold=MATCH_THRESHOLD):
+        self.phrase = phrase
+        self.threshold = threshold
+        self.tokens = tuple(tokenize(phrase))
+        self.codes = tuple(phonetic(t) for t in self.tokens)
+        self.limits = tuple(len(t) // LETTERS_PER_EDIT for t in self.tokens)
+        self._similarity = lru_cache(maxsize=4096)(self._token_similarity)
+
+    def _token_similarity(self, index, token):
+        target = self.tokens[index]
+        if token == target:
+            return 1.0
+        limit = self.limits[index]
+        # Sounding alike is required, never sufficient: the spelling must be close too
+        if limit == 0 or phonetic(token) != self.codes[index]:
+            return 0.0
+        distance = bounded_edit_distance(token, target, limit)
+        if distance > limit:
+            return 0.0
+        return 1.0 - distance / max(len(token), len(target))
+
+    def score_text(self, text):
+        """
+        Best similarity (0..1) of any run of words in text to the phrase.
+        """
+        if not self.tokens:
+            return 0.0
+        words = tokenize(text)
+        n = len(self.tokens)
+        if len(words) < n:
+            # Pad so a phrase with one word missed still gets partial credit
+            words = words + [''] * (n - len(words))
+        best = 0.0
+        for start in range(len(words) - n + 1):
+            total = 0.0
+            for i in range(n):
+                total += self._similarity(i, words[start + i])
+            if total > best * n:
+                best = total / n
+                if best == 1.0:
+                    break
+        return best
+
+    def match(self, alternatives):
+        """
+        Score the recognizer's n-best list of (text, confidence) pairs, where
+        confidence may be None. Returns (confidence, text) of the best one.
+        """
+        best = (0.0, None)
+        for rank, (text, confidence) in enumerate(alternatives):
+            if confidence is None:
+                confidence = max(0.0, 1.0 - RANK_DISCOUNT * rank)
+            score = self.score_text(text)
+            if score < 1.0:
+                score *= 0.5 + 0.5 * confidence
+            if score > best[0]:
+                best = (score, text)
+        return best
+
+    def is_match(self, alternatives):
+        return self.match(alternatives)[0] >= self.threshold
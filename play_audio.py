@@ -2,28 +2,41 @@ import sys
 import wave
 import pyaudio
 import os
+from evidence_codec import read_audio
 
 def play_audio(filename):
     if not os.path.exists(filename):
         print(f"❌ File not found: {filename}")
         return
     try:
-        wf = wave.open(filename, 'rb')
         pa = pyaudio.PyAudio()
-        stream = pa.open(format=pa.get_format_from_width(wf.getsampwidth()),
-                         channels=wf.getnchannels(),
-                         rate=wf.getframerate(),
-                         output=True)
-        print(f"▶️ Playing: {filename}")
         chunk = 1024
-        data = wf.readframes(chunk)
-        while data:
-            stream.write(data)
+        if filename.lower().endswith('.wav'):
+            wf = wave.open(filename, 'rb')
+            stream = pa.open(format=pa.get_format_from_width(wf.getsampwidth()),
+                             channels=wf.getnchannels(),
+                             rate=wf.getframerate(),
+                             output=True)
+            print(f"▶️ Playing: {filename}")
             data = wf.readframes(chunk)
+            while data:
+                stream.write(data)
+                data = wf.readframes(chunk)
+            wf.close()
+        else:
+            # Compressed evidence (e.g. FLAC) is decoded before playback
+            pcm, rate, channels, sample_width = read_audio(filename)
+            stream = pa.open(format=pa.get_format_from_width(sample_width),
+                             channels=channels,
+                             rate=rate,
+                             output=True)
+            print(f"▶️ Playing: {filename}")
+            step = chunk * channels * sample_width
+            for i in range(0, len(pcm), step):
+                stream.write(pcm[i:i + step])
         stream.stop_stream()
         stream.close()
         pa.terminate()
-        wf.close()
         print("✅ Playback finished.")
     except Exception as e:
         print(f"❌ Error playing audio: {e}")
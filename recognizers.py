@@ -0,0 +1,143 @@
+import os
+import json
+import threading
+import speech_recognition as sr
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Which speech-to-text engine to use: "google" (online) or "vosk" (offline)
+RECOGNIZER_BACKEND = os.getenv("RECOGNIZER_BACKEND", "google").lower()
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join("models", "vosk-model-small-en-us-0.15"))
+MAX_ALTERNATIVES = 5  # n-best hypotheses requested for fuzzy phrase matching
+
+
+class RecognizerUnavailable(RuntimeError):
+    """
+    Raised when the configured speech-to-text engine cannot be loaded.
+    """
+
+
+class RecognizerBackend:
+    """
+    Interface for speech-to-text engines used by the detector.
+
+    transcribe() receives raw mono PCM and returns the lower-cased text, or
+    None when nothing was understood. transcribe_alternatives() returns the
+    n-best list as (text, confidence) pairs, best first, where confidence is
+    None if the engine does not provide one. Both may be called from several
+    transcription workers at once.
+    """
+
+    name = "base"
+
+    def warm_up(self):
+        """
+        Load models / open connections ahead of the first window.
+        """
+
+    def transcribe(self, pcm, rate, sample_width):
+        alternatives = self.transcribe_alternatives(pcm, rate, sample_width)
+        return alternatives[0][0] if alternatives else None
+
+    def transcribe_alternatives(self, pcm, rate, sample_width):
+        raise NotImplementedError
+
+
+class GoogleRecognizer(RecognizerBackend):
+    """
+    Google Web Speech API through SpeechRecognition (needs network access).
+    """
+
+    name = "google"
+
+    def transcribe_alternatives(self, pcm, rate, sample_width):
+        r = sr.Recognizer()
+        try:
+            result = r.recognize_google(sr.AudioData(pcm, rate, sample_width), show_all=True)
+        except sr.RequestError as e:
+            print(f"Could not request results from Google Speech Recognition service; {e}")
+            return []
+        if not isinstance(result, dict):
+            # Nothing was understood
+            return []
+        return [(alt['transcript'].lower(), alt.get('confidence'))
+                for alt in result.get('alternative', [])[:MAX_ALTERNATIVES]]
+
+
+class VoskRecognizer(RecognizerBackend):
+    """
+    Fully local Kaldi-based recognizer (https://alphacephei.com/vosk/).
+
+    The acoustic model is loaded once and shared by all workers, so each
+    window only pays for CPU decoding. Download a model and point
+    VOSK_MODEL_PATH at its directory.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        self.model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            try:
+                import vosk
+            except ImportError:
+                raise RecognizerUnavailable("vosk is not installed (pip install vosk)")
+            if not os.path.isdir(self.model_path):
+                raise RecognizerUnavailable(f"Vosk model not found at {self.model_path}")
+            vosk.SetLogLevel(-1)
+            self._vosk = vosk
+            self._model = vosk.Model(self.model_path)
+            print(f"✅ Vosk model loaded: {self.model_path}")
+
+    def transcribe_alternatives(self, pcm, rate, sample_width):
+        self.warm_up()
+        # Recognizer objects are cheap; the model behind them is shared
+        rec = self._vosk.KaldiRecognizer(self._model, rate)
+        rec.SetMaxAlternatives(MAX_ALTERNATIVES)
+        rec.AcceptWaveform(pcm)
+        result = json.loads(rec.FinalResult())
+        # Vosk confidences are unnormalised decoder scores, so rely on rank order
+        texts = [alt.get('text', '').strip().lower() for alt in result.get('alternatives', [])]
+        return [(text, None) for text in texts if text]
+
+
+BACKENDS = {
+    'google': GoogleRecognizer,
+    'vosk': VoskRecognizer,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_recognizer(name=None):
+    """
+    Return the shared, warmed-up backend selected by name or RECOGNIZER_BACKEND.
+    Unknown names fall back to Google, but a known engine that fails to load
+    raises RecognizerUnavailable rather than silently sending audio online.
+    """
+    requested = (name or RECOGNIZER_BACKEND).lower()
+    with _instances_lock:
+        if requested in _instances:
+            return _instances[requested]
+        backend_class = BACKENDS.get(requested)
+        if backend_class is None:
+            print(f"❌ Unknown recognizer backend '{requested}'. Using google.")
+            backend_class = GoogleRecognizer
+        backend = _instances.get(backend_class.name) or backend_class()
+        try:
+            backend.warm_up()
+        except RecognizerUnavailable:
+            raise
+        except Exception as e:
+            raise RecognizerUnavailable(f"Could not load {backend.name} recognizer: {e}") from e
+        _instances[backend.name] = backend
+        _instances[requested] = backend
+        return backend
@@ -1,26 +1,20 @@
-import os
-from twilio.rest import Client
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from twilio_client import get_twilio_client, TWILIO_PHONE, RECIPIENT_PHONE
+from alert_dispatcher import AlertNotConfigured
 
 def send_sms_alert(location_link="Location unavailable"):
     """
     Sends an SMS alert using Twilio, including a location link.
+    Uses the shared, pre-warmed Twilio client.
+    Returns the message SID on success, None on failure. Raises
+    AlertNotConfigured if the Twilio settings are missing.
     """
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    twilio_phone = os.getenv("TWILIO_PHONE")
-    recipient_phone = os.getenv("RECIPIENT_PHONE_NUMBER")  # <-- updated variable name
+    client = get_twilio_client()
 
     # Check if all required environment variables are set
-    if not all([account_sid, auth_token, twilio_phone, recipient_phone]):
-        print("❌ Error: Twilio environment variables not set. Cannot send SMS.")
-        return
+    if client is None:
+        raise AlertNotConfigured("Twilio environment variables not set. Cannot send SMS.")
 
     try:
-        client = Client(account_sid, auth_token)
         message_body = (
             f"🚨 Silent Sentinel Alert: Secret phrase detected from Abhishek P.\n"
             f"Location: {location_link}"
@@ -28,12 +22,14 @@ def send_sms_alert(location_link="Location unavailable"):
 
         message = client.messages.create(
             body=message_body,
-            from_=twilio_phone,
-            to=recipient_phone  # <-- updated variable name
+            from_=TWILIO_PHONE,
+            to=RECIPIENT_PHONE
         )
         print(f"✅ SMS alert sent successfully! SID: {message.sid}")
+        return message.sid
     except Exception as e:
         print(f"❌ Failed to send SMS: {e}")
+        return None
 
 if __name__ == '__main__':
     # This block allows you to test the SMS functionality directly
@@ -0,0 +1,90 @@
+import os
+import socket
+import threading
+import unittest
+import socketserver
+from email.mime.text import MIMEText
+from unittest import mock
+
+import email_alert
+from email_alert import EmailTransport, send_email_alert
+from benchmark_alerts import FakeSMTPHandler, start_server
+
+
+class RecordingSMTPHandler(FakeSMTPHandler):
+    """
+    The benchmark's SMTP stand-in, recording every connection and the
+    commands received on it.
+    """
+
+    connections = []
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        self.commands = []
+        with self.lock:
+            self.connections.append(self)
+        lines = self.rfile
+
+        def recording():
+            for raw in lines:
+                self.commands.append(raw.decode('utf-8', 'replace').rstrip('\r\n'))
+                yield raw
+        self.rfile = recording()
+
+    def drop(self):
+        self.connection.shutdown(socket.SHUT_RDWR)
+
+
+class EmailTransportTest(unittest.TestCase):
+
+    def setUp(self):
+        RecordingSMTPHandler.connections = []
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), RecordingSMTPHandler)
+        self.server.daemon_threads = True
+        self.port = start_server(self.server)
+        self.transport = EmailTransport(host='127.0.0.1', port=self.port, username='sentinel@test.local',
+                                        password='secret', starttls=False, keepalive_seconds=0)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def message(self):
+        msg = MIMEText("test alert")
+        msg['Subject'] = "test"
+        msg['From'] = 'sentinel@test.local'
+        return msg
+
+    def mail_transactions(self, handler):
+        return [c for c in handler.commands if c.upper().startswith('MAIL FROM')]
+
+    def test_messages_share_one_session(self):
+        for _ in range(3):
+            self.assertEqual(self.transport.send(self.message(), ['a@test.local']), {})
+        self.assertEqual(len(RecordingSMTPHandler.connections), 1)
+        handler = RecordingSMTPHandler.connections[0]
+        self.assertEqual(len(self.mail_transactions(handler)), 3)
+        self.assertEqual(len([c for c in handler.commands if c.upper().startswith('AUTH')]), 1)
+
+    def test_dropped_session_is_reopened_on_next_send(self):
+        self.transport.send(self.message(), ['a@test.local'])
+        RecordingSMTPHandler.connections[0].drop()
+        self.assertEqual(self.transport.send(self.message(), ['a@test.local']), {})
+        self.assertEqual(len(RecordingSMTPHandler.connections), 2)
+        self.assertEqual(len(self.mail_transactions(RecordingSMTPHandler.connections[1])), 1)
+
+    def test_every_recipient_reaches_rcpt(self):
+        env = {'SENDER_EMAIL': 'sentinel@test.local',
+               'RECIPIENT_EMAIL': 'first@test.local, second@test.local,third@test.local'}
+        with mock.patch.dict(os.environ, env), mock.patch.object(email_alert, '_transport', self.transport):
+            self.assertTrue(send_email_alert("https://www.google.com/maps?q=1,2"))
+        handler = RecordingSMTPHandler.connections[0]
+        rcpt = [c.split(':', 1)[1].strip() for c in handler.commands if c.upper().startswith('RCPT TO')]
+        self.assertEqual(rcpt, ['<first@test.local>', '<second@test.local>', '<third@test.local>'])
+
+
+if __name__ == '__main__':
+    unittest.main()
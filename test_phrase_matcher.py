@@ -0,0 +1,37 @@
+import unittest
+
+from phrase_matcher import PhraseMatcher
+
+
+class PhraseMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = PhraseMatcher("help me lotus")
+
+    def test_exact_phrase_matches(self):
+        self.assertTrue(self.matcher.is_match([("help me lotus", 0.9)]))
+        self.assertEqual(self.matcher.match([("help me lotus", 0.5)])[0], 1.0)
+
+    def test_phrase_inside_sentence_matches(self):
+        self.assertTrue(self.matcher.is_match([("okay please help me lotus now", 0.9)]))
+
+    def test_long_word_tolerates_one_misspelling(self):
+        matcher = PhraseMatcher("silent sentinel")
+        self.assertTrue(matcher.is_match([("silent sentinal", 0.9)]))
+
+    def test_near_misses_do_not_match(self):
+        for text in ("help me lettuce", "help me lots", "help me locus", "help me lotis", "help me"):
+            with self.subTest(text=text):
+                self.assertFalse(self.matcher.is_match([(text, 0.9)]))
+
+    def test_best_alternative_wins(self):
+        confidence, text = self.matcher.match([("help me lots", 0.9), ("help me lotus", None)])
+        self.assertEqual(text, "help me lotus")
+        self.assertEqual(confidence, 1.0)
+
+    def test_no_alternatives(self):
+        self.assertEqual(self.matcher.match([]), (0.0, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import time
+import threading
+from collections import deque
+
+# Trigger states
+IDLE = "idle"                 # Listening, nothing pending
+PENDING = "pending"           # Phrase heard; the user can still cancel
+DISPATCHING = "dispatching"   # Alerts are being sent
+COOLDOWN = "cooldown"         # Alerts sent; further matches are ignored for a while
+
+# Outcomes returned by TriggerStateMachine.detect()
+TRIGGERED = "triggered"
+ESCALATED = "escalated"
+REPEATED = "repeated"
+DUPLICATE = "duplicate"
+IGNORED = "ignored"
+
+CANCEL_SECONDS = 10       # Cancel window before alerts go out
+COOLDOWN_SECONDS = 15     # Quiet period after alerts have been sent
+ESCALATE_DETECTIONS = 2   # Detections within the cancel window that send alerts at once
+HISTORY_SIZE = 50         # Transitions kept for monitoring
+
+
+class TriggerStateMachine:
+    """
+    Event-driven trigger/cancel/dispatch flow that runs alongside capture.
+
+    Detection results, the user's cancel and timer expiries are events that
+    move the machine between IDLE, PENDING, DISPATCHING and COOLDOWN; none of
+    them block the caller, so listening continues through the cancel window.
+    Hearing the phrase again while PENDING escalates straight to dispatch.
+
+    `dispatch(context)` runs on its own thread. Listeners are called as
+    listener(old_state, new_state, reason, context) after every transition,
+    outside the lock, and `transitions` keeps the recent history.
+    """
+
+    def __init__(self, dispatch, window_seconds=5.0, cancel_seconds=CANCEL_SECONDS,
+                 cooldown_seconds=COOLDOWN_SECONDS, escalate_after=ESCALATE_DETECTIONS):
+        self.dispatch = dispatch
+        self.window_seconds = window_seconds
+        self.cancel_seconds = cancel_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.escalate_after = max(1, escalate_after)
+        self.state = IDLE
+        self.context = None
+        self.transitions = deque(maxlen=HISTORY_SIZE)
+        self._listeners = []
+        self._heard_until = float('-inf')
+        self._timer = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remaining(self):
+        """
+        Seconds left in the cancel window (0 unless PENDING).
+        """
+        with self._lock:
+            if self.state != PENDING:
+                return 0.0
+            return max(0.0, self.context['deadline'] - time.monotonic())
+
+    def detect(self, window_start, confidence, text, **details):
+        """
+        Report a phrase match in the window starting at `window_start`
+        seconds of capture time. Extra keyword arguments (e.g. location_link)
+        are kept in the context handed to dispatch. Returns one of TRIGGERED,
+        ESCALATED, REPEATED, DUPLICATE or IGNORED.
+        """
+        with self._lock:
+            if window_start < self._heard_until:
+                # Overlapping window of an utterance that was already counted
+                return DUPLICATE
+            self._heard_until = window_start + self.window_seconds
+            if self.state == IDLE:
+                self.context = dict(details, text=text, confidence=confidence, detections=1,
+                                    deadline=time.monotonic() + self.cancel_seconds)
+                if self.cancel_seconds <= 0:
+                    events = [self._move(DISPATCHING, "detected")]
+                else:
+                    events = [self._move(PENDING, "detected")]
+                    self._start_timer(self.cancel_seconds, self._on_cancel_timeout)
+                outcome = TRIGGERED
+            elif self.state == PENDING:
+                self.context['detections'] += 1
+                self.context['confidence'] = max(self.context['confidence'], confidence)
+                if self.context['detections'] >= self.escalate_after:
+                    self._cancel_timer()
+                    events = [self._move(DISPATCHING, "escalated")]
+                    outcome = ESCALATED
+                else:
+                    events = []
+                    outcome = REPEATED
+            else:
+                return IGNORED
+        self._after(events)
+        return outcome
+
+    def cancel(self):
+        """
+        Cancel a pending trigger. Returns False if it was too late.
+        """
+        with self._lock:
+            if self.state != PENDING:
+                return False
+            self._cancel_timer()
+            events = [self._move(IDLE, "cancelled")]
+        self._after(events)
+        return True
+
+    def stop(self):
+        """
+        Drop a pending trigger and stop the timers. Alerts that are already
+        being dispatched still complete.
+        """
+        with self._lock:
+            self._cancel_timer()
+            events = []
+            if self.state in (PENDING, COOLDOWN):
+                events.append(self._move(IDLE, "stopped"))
+        self._after(events)
+
+    def _move(self, new_state, reason):
+        old_state, self.state = self.state, new_state
+        self.transitions.append((time.time(), old_state, new_state, reason))
+        return old_state, new_state, reason, self.context
+
+    def _start_timer(self, seconds, callback):
+        self._cancel_timer()
+        self._timer = threading.Timer(seconds, callback, args=(self._generation,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        # Bumping the generation makes a timer that already fired a no-op
+        self._generation += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_cancel_timeout(self, generation):
+        with self._lock:
+            if generation != self._generation or self.state != PENDING:
+                return
+            self._timer = None
+            events = [self._move(DISPATCHING, "timeout")]
+        self._after(events)
+
+    def _on_cooldown_timeout(self, generation):
+        with self._lock:
+            if generation != self._generation or self.state != COOLDOWN:
+                return
+            self._timer = None
+            events = [self._move(IDLE, "cooldown over")]
+        self._after(events)
+
+    def _run_dispatch(self, context):
+        try:
+            self.dispatch(context)
+        except Exception as e:
+            print(f"❌ Alert dispatch failed: {e}")
+        with self._lock:
+            events = [self._move(COOLDOWN, "dispatched")]
+            self._start_timer(self.cooldown_seconds, self._on_cooldown_timeout)
+        self._after(events)
+
+    def _after(self, events):
+        for old_state, new_state, reason, context in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(old_state, new_state, reason, context)
+                except Exception as e:
+                    print(f"❌ Trigger listener error: {e}")
+            # Only after listeners have seen DISPATCHING, so COOLDOWN can never be reported before it
+            if new_state == DISPATCHING:
+                thread = threading.Thread(target=self._run_dispatch, args=(context,), name="alert-dispatch")
+                thread.daemon = True
+                thread.start()
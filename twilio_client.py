@@ -0,0 +1,79 @@
+import os
+import threading
+from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Twilio settings, read once for every Twilio-based channel
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_PHONE = os.getenv("TWILIO_PHONE") or os.getenv("TWILIO_PHONE_NUMBER")
+RECIPIENT_PHONE = os.getenv("RECIPIENT_PHONE_NUMBER")
+TWILIO_TIMEOUT_SECONDS = float(os.getenv("TWILIO_TIMEOUT_SECONDS", "15"))
+# Idle connections are refreshed this often so the TLS session stays open; 0 disables
+TWILIO_KEEPALIVE_SECONDS = float(os.getenv("TWILIO_KEEPALIVE_SECONDS", "120"))
+
+_client = None
+_client_lock = threading.Lock()
+_keepalive_stop = threading.Event()
+_keepalive_thread = None
+
+
+def twilio_configured():
+    return all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE, RECIPIENT_PHONE])
+
+
+def get_twilio_client():
+    """
+    Return the process-wide Twilio client, or None if Twilio is not
+    configured. The client keeps a pooled HTTP session, so after warm-up
+    alerts reuse an open TLS connection instead of a new handshake each time.
+    """
+    global _client
+    if not twilio_configured():
+        return None
+    with _client_lock:
+        if _client is None:
+            http_client = TwilioHttpClient(pool_connections=True, timeout=TWILIO_TIMEOUT_SECONDS)
+            _client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+        return _client
+
+
+def _ping(client):
+    # Cheapest authenticated request: fetches the account resource
+    client.api.accounts(TWILIO_ACCOUNT_SID).fetch()
+
+
+def _keepalive():
+    while not _keepalive_stop.wait(TWILIO_KEEPALIVE_SECONDS):
+        try:
+            _ping(get_twilio_client())
+        except Exception as e:
+            print(f"⚠️ Twilio keepalive failed: {e}")
+
+
+def warm_up_twilio():
+    """
+    Create the client and open its connection in the background (DNS, TLS
+    and auth), then keep it alive. Safe to call more than once.
+    """
+    global _keepalive_thread
+    if not twilio_configured():
+        print("⚠️ Twilio environment variables not set; SMS and calls are disabled.")
+        return
+
+    def warm():
+        try:
+            _ping(get_twilio_client())
+            print("✅ Twilio connection ready.")
+        except Exception as e:
+            print(f"⚠️ Could not pre-connect to Twilio: {e}")
+
+    threading.Thread(target=warm, name="twilio-warmup", daemon=True).start()
+    with _client_lock:
+        if TWILIO_KEEPALIVE_SECONDS > 0 and _keepalive_thread is None:
+            _keepalive_thread = threading.Thread(target=_keepalive, name="twilio-keepalive", daemon=True)
+            _keepalive_thread.start()
@@ -10,7 +10,7 @@ def view_database_logs():
         return
 
     # Convert logs to a list of dictionaries for better display
-    headers = ["ID", "Filename", "Timestamp", "Location URL", "Transcription"]
+    headers = ["ID", "Filename", "Timestamp", "Location URL", "Transcription", "Codec", "Duration (s)", "Size (bytes)"]
     
     # Format the table
     print("\n=== Silent Sentinel Audio Logs ===\n")
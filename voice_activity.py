@@ -0,0 +1,78 @@
+import threading
+import numpy as np
+
+# Voice activity gate settings
+FRAME_MS = 20                # Analysis frame length
+SPEECH_MARGIN_DB = 9.0       # How far above the noise floor a frame must be
+MIN_NOISE_FLOOR = 30.0       # RMS floor so digital silence never looks like speech
+MAX_SPEECH_ZCR = 0.35        # Frames crossing zero more often than this are hiss
+MIN_SPEECH_MS = 300          # Speech needed in a window before it is transcribed
+NOISE_FLOOR_RISE = 0.05      # How quickly the floor follows a louder room
+
+
+class VoiceActivityGate:
+    """
+    Cheap energy + zero-crossing voice activity detector.
+
+    Each window is split into short frames and analysed in one vectorized
+    pass. Frames well above the adaptive noise floor with a speech-like
+    zero-crossing rate count as speech; windows without enough of them are
+    skipped before any recognizer call.
+    """
+
+    def __init__(self, rate, frame_ms=FRAME_MS, margin_db=SPEECH_MARGIN_DB,
+                 min_speech_ms=MIN_SPEECH_MS):
+        self.frame_len = max(1, int(rate * frame_ms / 1000))
+        self.margin = 10 ** (margin_db / 20)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.noise_floor = None
+        self.windows_passed = 0
+        self.windows_skipped = 0
+        self._lock = threading.Lock()
+
+    def is_speech(self, pcm):
+        """
+        Return True if the int16 mono PCM window contains enough speech.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n_frames = len(samples) // self.frame_len
+        if n_frames == 0:
+            return self._count(False)
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len).astype(np.float32)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_len
+
+        with self._lock:
+            # The quietest frames of the window estimate the current room noise
+            quiet = max(float(np.percentile(rms, 10)), MIN_NOISE_FLOOR)
+            if self.noise_floor is None or quiet < self.noise_floor:
+                self.noise_floor = quiet
+            else:
+                self.noise_floor += NOISE_FLOOR_RISE * (quiet - self.noise_floor)
+            threshold = self.noise_floor * self.margin
+
+        speech_frames = np.count_nonzero((rms > threshold) & (zcr < MAX_SPEECH_ZCR))
+        return self._count(speech_frames >= self.min_speech_frames)
+
+    def _count(self, passed):
+        with self._lock:
+            if passed:
+                self.windows_passed += 1
+            else:
+                self.windows_skipped += 1
+        return passed
+
+    def stats(self):
+        """
+        Counters for how many windows were skipped vs. sent to the recognizer.
+        """
+        with self._lock:
+            total = self.windows_passed + self.windows_skipped
+            return {
+                'windows_passed': self.windows_passed,
+                'windows_skipped': self.windows_skipped,
+                'skip_ratio': self.windows_skipped / total if total else 0.0,
+                'noise_floor': self.noise_floor,
+            }